@@ -3,41 +3,87 @@ LogicCorrelator - Event Aggregator
 Central event aggregation and normalization service
 """
 
-import json
+import gc
 import sys
 import time
 import threading
-import queue
+from array import array
+from collections import deque
 from datetime import datetime, timedelta
 from typing import Dict, List, Any, Optional
 from pathlib import Path
 import yaml
 import subprocess
 
+try:
+    import simdjson
+except ImportError:  # pragma: no cover - optional speedup
+    simdjson = None
+
 from event_schema import EventValidator
+from json_codec import dumps, loads
+from event_ring import SharedEventRing
 from state_manager import StateManager
 
+# Slots in EventAggregator._counters
+RECV, VALID, REJECT, FWD = 0, 1, 2, 3
+
+
+def _make_line_decoder():
+    """
+    Build the decoder used for newline-delimited JSON on stdin
+    
+    When pysimdjson is installed a single Parser is reused for every line so
+    its internal buffers are recycled instead of reallocated per event.
+    
+    Returns:
+        Callable mapping one JSON line to an event dictionary
+    """
+    if simdjson is None:
+        return lambda line: loads(line.strip())
+    
+    parser = simdjson.Parser()
+    
+    def decode(line: str) -> Dict[str, Any]:
+        # Parsed documents are only valid until the next parse() call, and
+        # the pipeline mutates events, so materialize the dict right away
+        return parser.parse(line.encode('utf-8')).as_dict()
+    
+    return decode
+
 
 class EventAggregator:
     """Central event aggregation and processing service"""
     
+    # Substring -> event type, checked in order after the auth check
+    TYPE_HINTS = (
+        ('process', 'process_start'),
+        ('network', 'network_connect'),
+        ('connection', 'network_connect'),
+        ('file', 'file_access')
+    )
+    
     def __init__(self, config_path: str = "config/config.yaml"):
         """Initialize the event aggregator"""
         self.config = self._load_config(config_path)
-        self.event_queue = queue.Queue(maxsize=self.config['collection']['buffer_size'])
+        # Single-consumer hand-off: deque append/popleft are atomic under the
+        # GIL, and the event only wakes the consumer when it is idle
+        self.buffer_size = self.config['collection']['buffer_size']
+        self.event_queue = deque()
+        self._wakeup = threading.Event()
         self.validator = EventValidator("config/event_schema.json")
         self.state_manager = StateManager(self.config)
         
         self.running = False
-        self.stats = {
-            'events_received': 0,
-            'events_validated': 0,
-            'events_rejected': 0,
-            'events_forwarded': 0
-        }
+        # Counters live in a flat int64 array indexed by RECV/VALID/REJECT/FWD;
+        # get_stats() turns them back into the named dict form
+        self._counters = array('q', [0, 0, 0, 0])
         
-        # Lua engine process
+        self.processing_thread = None
+        
+        # Lua engine process and shared memory event transport
         self.lua_engine = None
+        self.event_ring = None
         
         print("[AGGREGATOR] Event Aggregator initialized")
     
@@ -53,29 +99,56 @@ class EventAggregator:
         self.running = True
         print("[AGGREGATOR] Starting event aggregator...")
         
+        # Move everything allocated during startup (config, schemas, modules)
+        # to the permanent generation so cyclic GC passes triggered by event
+        # churn don't keep rescanning it
+        gc.freeze()
+        
+        # Start Lua correlation engine first, so the event ring exists before
+        # the processing thread forwards its first batch
+        self._start_lua_engine()
+        
         # Start processing thread
         self.processing_thread = threading.Thread(target=self._process_events, daemon=True)
         self.processing_thread.start()
         
-        # Start Lua correlation engine
-        self._start_lua_engine()
-        
         print("[AGGREGATOR] Event aggregator started")
     
     def stop(self):
         """Stop the aggregator service"""
         print("[AGGREGATOR] Stopping event aggregator...")
         self.running = False
+        self._wakeup.set()
+        
+        # Let an in-flight batch finish before the ring it writes to is closed
+        if self.processing_thread is not None:
+            self.processing_thread.join()
+            self.processing_thread = None
         
         if self.lua_engine:
             self.lua_engine.terminate()
             self.lua_engine.wait()
         
+        if self.event_ring:
+            self.event_ring.close()
+            self.event_ring = None
+        
         print("[AGGREGATOR] Event aggregator stopped")
     
     def _start_lua_engine(self):
         """Start the Lua correlation engine as a subprocess"""
         try:
+            # Shared memory ring the Lua engine maps to read forwarded events
+            ipc_config = self.config.get('correlation', {}).get('ipc', {})
+            if ipc_config.get('transport') == 'shm':
+                self.event_ring = SharedEventRing(
+                    ipc_config.get('shm_name', 'logiccorrelator_events'),
+                    ipc_config.get('ring_size', 16 * 1024 * 1024),
+                    reset=ipc_config.get('shm_reset', False)
+                )
+                print(f"[AGGREGATOR] Shared memory event ring ready: {self.event_ring.name} "
+                      f"({self.event_ring.capacity} bytes)")
+            
             # In production, this would start the Lua engine
             # For now, we'll simulate it
             print("[AGGREGATOR] Lua correlation engine interface ready")
@@ -92,105 +165,131 @@ class EventAggregator:
         Returns:
             True if event was queued, False otherwise
         """
-        self.stats['events_received'] += 1
+        counters = self._counters
+        counters[RECV] += 1
         
-        try:
-            # Add timestamp if not present
-            if 'timestamp' not in event:
-                event['timestamp'] = datetime.utcnow().isoformat()
-            
-            # Queue the event
-            self.event_queue.put(event, block=False)
-            return True
-            
-        except queue.Full:
+        if len(self.event_queue) >= self.buffer_size:
             print("[AGGREGATOR] Event queue full, dropping event")
-            self.stats['events_rejected'] += 1
+            counters[REJECT] += 1
             return False
+        
+        # Receive time is kept as integer nanoseconds; formatting it per
+        # event costs far more than reading the clock
+        event['_received_ns'] = time.time_ns()
+        
+        # Add timestamp if not present
+        if 'timestamp' not in event:
+            event['timestamp'] = datetime.utcnow().isoformat()
+        
+        # Queue the event and wake the consumer
+        self.event_queue.append(event)
+        self._wakeup.set()
+        return True
     
     def _process_events(self):
         """Background thread to process queued events"""
         print("[AGGREGATOR] Event processing thread started")
         
-        batch = []
         batch_size = self.config['performance']['batch_size']
         
+        pending_events = self.event_queue
+        wakeup = self._wakeup
+        
         while self.running:
+            # Sleep only when idle; producers set the flag after appending
+            if not pending_events:
+                wakeup.wait(timeout=1.0)
+            wakeup.clear()
+            
+            # Drain up to batch_size events in one pass
+            pending = []
+            try:
+                while len(pending) < batch_size:
+                    pending.append(pending_events.popleft())
+            except IndexError:
+                pass
+            
+            if pending:
+                self._process_batch(pending)
+    
+    def _process_batch(self, pending: List[Dict[str, Any]]):
+        """
+        Normalize, validate and store a drained batch, then forward it
+        
+        Args:
+            pending: Raw events taken from the queue
+        """
+        batch = []
+        
+        # Bind hot attributes to locals once per batch
+        counters = self._counters
+        normalize = self._normalize_event
+        validate = self.validator.validate
+        add_event = self.state_manager.add_event
+        
+        for event in pending:
             try:
-                # Get event from queue with timeout
-                event = self.event_queue.get(timeout=1.0)
-                
                 # Normalize and validate
-                normalized_event = self._normalize_event(event)
+                normalized_event = normalize(event)
                 
-                if self.validator.validate(normalized_event):
-                    self.stats['events_validated'] += 1
+                if validate(normalized_event):
+                    counters[VALID] += 1
                     batch.append(normalized_event)
                     
                     # Update state manager
-                    self.state_manager.add_event(normalized_event)
-                    
-                    # Process batch when full
-                    if len(batch) >= batch_size:
-                        self._forward_batch(batch)
-                        batch = []
+                    add_event(normalized_event)
                 else:
-                    self.stats['events_rejected'] += 1
+                    counters[REJECT] += 1
                     print(f"[AGGREGATOR] Invalid event rejected: {normalized_event.get('type', 'unknown')}")
                 
-            except queue.Empty:
-                # Process any remaining events in batch
-                if batch:
-                    self._forward_batch(batch)
-                    batch = []
-                continue
             except Exception as e:
                 print(f"[AGGREGATOR] Error processing event: {e}")
-                self.stats['events_rejected'] += 1
+                counters[REJECT] += 1
+        
+        if batch:
+            self._forward_batch(batch)
     
     def _normalize_event(self, event: Dict[str, Any]) -> Dict[str, Any]:
         """
-        Normalize event to standard schema
+        Normalize event to standard schema in place
         
         Args:
             event: Raw event
             
         Returns:
-            Normalized event
+            The same event, normalized
         """
-        normalized = event.copy()
+        # The event is owned by the aggregator once queued, so it is normalized
+        # in place and metadata is kept as flat underscore keys
         
         # Ensure required fields
-        if 'type' not in normalized:
+        if 'type' not in event:
             # Try to infer type from event content
-            normalized['type'] = self._infer_event_type(event)
+            event['type'] = self._infer_event_type(event)
         
         # Normalize timestamp to ISO8601
-        if 'timestamp' in normalized:
-            if isinstance(normalized['timestamp'], (int, float)):
-                normalized['timestamp'] = datetime.fromtimestamp(normalized['timestamp']).isoformat()
+        timestamp = event.get('timestamp')
+        if isinstance(timestamp, (int, float)):
+            event['timestamp'] = datetime.fromtimestamp(timestamp).isoformat()
         
         # Add metadata
-        normalized['_metadata'] = {
-            'received_at': datetime.utcnow().isoformat(),
-            'source': event.get('_source', 'unknown')
-        }
+        if '_received_ns' not in event:
+            event['_received_ns'] = time.time_ns()
+        event['_source'] = event.get('_source', 'unknown')
         
-        return normalized
+        return event
     
     def _infer_event_type(self, event: Dict[str, Any]) -> str:
         """Infer event type from event fields"""
-        # Simple heuristics
-        if 'auth' in str(event).lower():
-            if 'fail' in str(event).lower():
-                return 'auth_fail'
-            return 'auth_success'
-        elif 'process' in str(event).lower():
-            return 'process_start'
-        elif 'network' in str(event).lower() or 'connection' in str(event).lower():
-            return 'network_connect'
-        elif 'file' in str(event).lower():
-            return 'file_access'
+        # Simple heuristics over the lowercased event text, built once
+        text = str(event).lower()
+        
+        if 'auth' in text:
+            return 'auth_fail' if 'fail' in text else 'auth_success'
+        
+        for hint, event_type in self.TYPE_HINTS:
+            if hint in text:
+                return event_type
         
         return 'unknown'
     
@@ -201,40 +300,45 @@ class EventAggregator:
         Args:
             batch: List of normalized events
         """
-        try:
-            # In production, this would send to Lua engine via IPC
-            # For now, we'll just log
-            for event in batch:
-                self._forward_to_lua(event)
-                self.stats['events_forwarded'] += 1
-            
-            if len(batch) > 0:
-                print(f"[AGGREGATOR] Forwarded batch of {len(batch)} events to correlation engine")
+        if not batch:
+            return
         
-        except Exception as e:
-            print(f"[AGGREGATOR] Error forwarding batch: {e}")
+        # The whole batch goes to the Lua engine as one JSON array message
+        if self._forward_to_lua(batch):
+            self._counters[FWD] += len(batch)
+            print(f"[AGGREGATOR] Forwarded batch of {len(batch)} events to correlation engine")
     
-    def _forward_to_lua(self, event: Dict[str, Any]):
+    def _forward_to_lua(self, batch: List[Dict[str, Any]]) -> bool:
         """
-        Forward single event to Lua engine
+        Forward a batch of events to the Lua engine as a single message
         
         Args:
-            event: Normalized event
+            batch: Normalized events
+            
+        Returns:
+            True if the batch was handed off, False otherwise
         """
-        # In production, this would use named pipes, sockets, or FFI
-        # For demonstration, we'll write to a file that Lua can read
         try:
-            event_json = json.dumps(event)
-            # Could write to named pipe or socket here
-            pass
+            payload = dumps(batch)
+            
+            # Copy into the shared memory ring: one record per batch
+            if self.event_ring is not None and not self.event_ring.write(payload):
+                print(f"[AGGREGATOR] Event ring full, dropping batch of {len(batch)} events")
+                return False
+            return True
         except Exception as e:
-            print(f"[AGGREGATOR] Error forwarding event: {e}")
+            print(f"[AGGREGATOR] Error forwarding batch: {e}")
+            return False
     
     def get_stats(self) -> Dict[str, Any]:
         """Get aggregator statistics"""
+        counters = self._counters
         return {
-            **self.stats,
-            'queue_size': self.event_queue.qsize(),
+            'events_received': counters[RECV],
+            'events_validated': counters[VALID],
+            'events_rejected': counters[REJECT],
+            'events_forwarded': counters[FWD],
+            'queue_size': len(self.event_queue),
             'state_manager_stats': self.state_manager.get_stats()
         }
     
@@ -266,16 +370,18 @@ def main():
     
     try:
         # Listen for events on stdin
-        print("[AGGREGATOR] Listening for events on stdin (JSON format)...")
+        # Flushed so a supervisor watching the output sees readiness immediately
+        print("[AGGREGATOR] Listening for events on stdin (JSON format)...", flush=True)
         print("[AGGREGATOR] Press Ctrl+C to stop")
         
         stats_interval = 30  # Print stats every 30 seconds
         last_stats_time = time.time()
+        decode_line = _make_line_decoder()
         
         for line in sys.stdin:
             try:
                 # Parse JSON event
-                event = json.loads(line.strip())
+                event = decode_line(line)
                 aggregator.receive_event(event)
                 
                 # Print stats periodically
@@ -283,7 +389,8 @@ def main():
                     aggregator.print_stats()
                     last_stats_time = time.time()
                     
-            except json.JSONDecodeError:
+            except ValueError:
+                # JSON decode errors (either codec) and simdjson parse errors
                 print(f"[AGGREGATOR] Invalid JSON: {line[:100]}")
             except Exception as e:
                 print(f"[AGGREGATOR] Error: {e}")
@@ -0,0 +1,109 @@
+"""
+LogicCorrelator - Shared Memory Event Ring
+Single-producer/single-consumer ring buffer for Python -> Lua event IPC
+"""
+
+import struct
+from multiprocessing import shared_memory
+
+
+class SharedEventRing:
+    """
+    SPSC byte ring in a named shared memory segment
+    
+    Layout (little-endian):
+        [0:8]   head - total bytes consumed (written by the reader)
+        [8:16]  tail - total bytes published (written by the writer)
+        [16:]   data - records of [length: u32][payload bytes]
+    
+    head and tail grow monotonically; positions in the data region are taken
+    modulo its capacity, and records may wrap around the end. The writer copies
+    a record in full before publishing the new tail, so a reader never sees a
+    partially written record. The reader maps the same segment (e.g. via
+    LuaJIT FFI on /dev/shm/<name>) and advances head after consuming records.
+    """
+    
+    HEADER = struct.Struct('<QQ')
+    LENGTH = struct.Struct('<I')
+    
+    def __init__(self, name: str, size: int = 16 * 1024 * 1024, reset: bool = False):
+        """
+        Create the shared memory segment
+        
+        Args:
+            name: Segment name shared with the consumer
+            size: Total segment size in bytes (header included)
+            reset: Replace an existing segment of the same name (only safe
+                when it was left behind by a crashed run)
+        
+        Raises:
+            FileExistsError: The name is taken and reset is False
+        """
+        try:
+            self._shm = shared_memory.SharedMemory(name=name, create=True, size=size)
+        except FileExistsError:
+            if not reset:
+                # May belong to a running aggregator and its Lua reader
+                raise FileExistsError(
+                    f"Shared memory segment '{name}' already exists; another aggregator "
+                    f"may be using it (set correlation.ipc.shm_reset to reclaim a stale one)"
+                ) from None
+            stale = shared_memory.SharedMemory(name=name)
+            stale.close()
+            stale.unlink()
+            self._shm = shared_memory.SharedMemory(name=name, create=True, size=size)
+        
+        self.name = name
+        self._buf = self._shm.buf
+        self._data = self._buf[self.HEADER.size:]
+        self.capacity = len(self._data)
+        self.HEADER.pack_into(self._buf, 0, 0, 0)
+    
+    def write(self, payload: bytes) -> bool:
+        """
+        Append one record to the ring
+        
+        Args:
+            payload: Serialized event bytes
+        
+        Returns:
+            True if written, False if the ring does not have enough free space
+        """
+        head, tail = self.HEADER.unpack_from(self._buf, 0)
+        needed = self.LENGTH.size + len(payload)
+        
+        if needed > self.capacity - (tail - head):
+            return False
+        
+        self._copy_in(tail, self.LENGTH.pack(len(payload)))
+        self._copy_in(tail + self.LENGTH.size, payload)
+        
+        # Publish only after the record is fully copied
+        struct.pack_into('<Q', self._buf, 8, tail + needed)
+        return True
+    
+    def _copy_in(self, position: int, data: bytes):
+        """Copy bytes into the data region at a logical position, wrapping at the end"""
+        start = position % self.capacity
+        first = min(len(data), self.capacity - start)
+        self._data[start:start + first] = data[:first]
+        if first < len(data):
+            self._data[:len(data) - first] = data[first:]
+    
+    def pending_bytes(self) -> int:
+        """Bytes published but not yet consumed"""
+        head, tail = self.HEADER.unpack_from(self._buf, 0)
+        return tail - head
+    
+    def close(self, unlink: bool = True):
+        """
+        Release the segment
+        
+        Args:
+            unlink: Also remove the segment name (the creator should)
+        """
+        self._data.release()
+        self._buf = None
+        self._shm.close()
+        if unlink:
+            self._shm.unlink()
@@ -4,9 +4,94 @@ Validates events against JSON schema definitions
 """
 
 import json
-from typing import Dict, Any, Optional
+from dataclasses import dataclass
+from typing import Dict, Any, Callable, FrozenSet, Iterable, List, Optional, Tuple
 from pathlib import Path
 
+try:
+    from json_codec import loads
+except ImportError:  # imported as core.event_schema rather than from core/
+    from core.json_codec import loads
+
+
+# Schema type names mapped to the Python types checked with isinstance
+_PYTHON_TYPES: Dict[str, type] = {
+    'string': str,
+    'integer': int,
+    'boolean': bool
+}
+
+_MISSING = object()
+
+
+@dataclass(frozen=True)
+class FieldSpec:
+    """Field specification resolved once from the schema JSON"""
+    
+    name: str
+    required: bool
+    python_type: Optional[type]
+    allowed: Optional[FrozenSet[Any]]
+    
+    @classmethod
+    def from_schema(cls, name: str, field_spec: Dict[str, Any]) -> 'FieldSpec':
+        """
+        Build a FieldSpec from a schema field definition
+        
+        Args:
+            name: Field name
+            field_spec: Field specification from schema
+            
+        Returns:
+            Resolved field specification
+        """
+        return cls(
+            name=name,
+            required=bool(field_spec.get('required', False)),
+            python_type=_PYTHON_TYPES.get(field_spec.get('type', 'string')),
+            allowed=frozenset(field_spec['enum']) if 'enum' in field_spec else None
+        )
+
+
+def _make_validator(event_type: str,
+                    specs: Tuple[FieldSpec, ...]) -> Callable[[Dict[str, Any]], bool]:
+    """
+    Specialize validation for one event type
+    
+    The field specs are flattened into (name, required, python_type,
+    allowed_values) tuples so the returned closure does no schema lookups or
+    type-name comparisons per event, and enum checks are frozenset lookups.
+    
+    Args:
+        event_type: Event type name (used in log messages)
+        specs: Resolved field specifications
+        
+    Returns:
+        Function returning True if an event of this type is valid
+    """
+    checks: List[Tuple[str, bool, Optional[type], Optional[FrozenSet[Any]]]] = [
+        (spec.name, spec.required, spec.python_type, spec.allowed) for spec in specs
+    ]
+    
+    def validate(event: Dict[str, Any]) -> bool:
+        for field_name, required, python_type, allowed in checks:
+            value = event.get(field_name, _MISSING)
+            
+            if value is _MISSING:
+                if required:
+                    print(f"[VALIDATOR] Missing required field '{field_name}' for event type '{event_type}'")
+                    return False
+                continue
+            
+            if ((python_type is not None and not isinstance(value, python_type))
+                    or (allowed is not None and value not in allowed)):
+                print(f"[VALIDATOR] Invalid type for field '{field_name}' in event type '{event_type}'")
+                return False
+        
+        return True
+    
+    return validate
+
 
 class EventValidator:
     """Validates events against defined schemas"""
@@ -20,13 +105,25 @@ class EventValidator:
         """
         self.schema_path = schema_path
         self.schemas = self._load_schemas()
+        self.field_specs: Dict[str, Tuple[FieldSpec, ...]] = {
+            event_type: tuple(
+                FieldSpec.from_schema(name, spec)
+                for name, spec in schema.get('fields', {}).items()
+            )
+            for event_type, schema in self.schemas.items()
+        }
+        self._validators: Dict[str, Callable[[Dict[str, Any]], bool]] = {
+            event_type: _make_validator(event_type, specs)
+            for event_type, specs in self.field_specs.items()
+        }
         print(f"[VALIDATOR] Loaded {len(self.schemas)} event type schemas")
     
     def _load_schemas(self) -> Dict[str, Dict]:
         """Load event schemas from JSON file"""
         try:
-            with open(self.schema_path, 'r') as f:
-                data = json.load(f)
+            with open(self.schema_path, 'rb') as f:
+                raw = f.read()
+            data = loads(raw)
             return data.get('event_types', {})
         except FileNotFoundError:
             print(f"[VALIDATOR] Warning: Schema file not found: {self.schema_path}")
@@ -51,55 +148,26 @@ class EventValidator:
             print("[VALIDATOR] Event missing 'type' field")
             return False
         
-        if event_type not in self.schemas:
+        validator = self._validators.get(event_type)
+        
+        if validator is None:
             print(f"[VALIDATOR] Unknown event type: {event_type}")
             return False
         
-        schema = self.schemas[event_type]
-        fields = schema.get('fields', {})
-        
-        # Validate required fields
-        for field_name, field_spec in fields.items():
-            if field_spec.get('required', False):
-                if field_name not in event:
-                    print(f"[VALIDATOR] Missing required field '{field_name}' for event type '{event_type}'")
-                    return False
-            
-            # Validate field type if present
-            if field_name in event:
-                if not self._validate_field_type(event[field_name], field_spec):
-                    print(f"[VALIDATOR] Invalid type for field '{field_name}' in event type '{event_type}'")
-                    return False
-        
-        return True
+        return validator(event)
     
-    def _validate_field_type(self, value: Any, field_spec: Dict) -> bool:
+    def count_valid(self, events: Iterable[Dict[str, Any]]) -> int:
         """
-        Validate field value against type specification
+        Validate a batch of events
         
         Args:
-            value: Field value
-            field_spec: Field specification from schema
+            events: Events to validate
             
         Returns:
-            True if valid, False otherwise
+            Number of valid events
         """
-        field_type = field_spec.get('type', 'string')
-        
-        # Type checking
-        if field_type == 'string' and not isinstance(value, str):
-            return False
-        elif field_type == 'integer' and not isinstance(value, int):
-            return False
-        elif field_type == 'boolean' and not isinstance(value, bool):
-            return False
-        
-        # Enum validation
-        if 'enum' in field_spec:
-            if value not in field_spec['enum']:
-                return False
-        
-        return True
+        # map() drives the per-type validators without a Python-level loop
+        return sum(map(self.validate, events))
     
     def get_schema(self, event_type: str) -> Optional[Dict]:
         """
@@ -113,6 +181,6 @@ class EventValidator:
         """
         return self.schemas.get(event_type)
     
-    def list_event_types(self) -> list:
+    def list_event_types(self) -> List[str]:
         """Get list of all supported event types"""
         return list(self.schemas.keys())
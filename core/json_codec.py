@@ -0,0 +1,49 @@
+"""
+LogicCorrelator - JSON Codec
+Shared JSON encoding and decoding, using orjson when it is installed
+"""
+
+import json
+from typing import Any
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - optional speedup
+    orjson = None
+
+
+# Both backends produce the same text: compact separators, or 2-space
+# indentation with "key": value pairs. Decode errors are ValueErrors in both
+# cases (orjson.JSONDecodeError subclasses json.JSONDecodeError).
+if orjson is not None:
+    def dumps(obj: Any, indent: bool = False) -> bytes:
+        """
+        Serialize to UTF-8 JSON bytes
+        
+        Args:
+            obj: Object to serialize
+            indent: Indent nested values by 2 spaces
+        
+        Returns:
+            Encoded JSON
+        """
+        return orjson.dumps(obj, option=orjson.OPT_INDENT_2) if indent else orjson.dumps(obj)
+
+    loads = orjson.loads
+else:
+    def dumps(obj: Any, indent: bool = False) -> bytes:
+        """
+        Serialize to UTF-8 JSON bytes
+        
+        Args:
+            obj: Object to serialize
+            indent: Indent nested values by 2 spaces
+        
+        Returns:
+            Encoded JSON
+        """
+        if indent:
+            return json.dumps(obj, indent=2, ensure_ascii=False).encode('utf-8')
+        return json.dumps(obj, separators=(',', ':'), ensure_ascii=False).encode('utf-8')
+
+    loads = json.loads
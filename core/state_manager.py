@@ -4,11 +4,98 @@ Manages correlation state and temporal event windows
 """
 
 import time
-from datetime import datetime, timedelta
+from array import array
+from bisect import bisect_left, bisect_right
+from datetime import datetime, timedelta, timezone
 from typing import Dict, List, Any, Optional
 from collections import defaultdict, deque
 
 
+_NS_PER_SECOND = 1_000_000_000
+_NO_EVENTS_NS = 2 ** 63 - 1  # int64 max: "oldest timestamp" when nothing is stored
+_EPOCH = datetime(1970, 1, 1, tzinfo=timezone.utc)
+_ONE_MICROSECOND = timedelta(microseconds=1)
+
+
+def _to_epoch_ns(timestamp: str) -> int:
+    """
+    Convert an ISO8601 timestamp to integer nanoseconds since the Unix epoch
+    
+    Timestamps without an offset are treated as UTC, matching the naive
+    utcnow() stamps added upstream. Unparseable values map to the current time.
+    
+    Args:
+        timestamp: ISO8601 timestamp string
+        
+    Returns:
+        Epoch nanoseconds
+    """
+    try:
+        dt = datetime.fromisoformat(timestamp.replace('Z', '+00:00'))
+    except (TypeError, ValueError):
+        return time.time_ns()
+    
+    if dt.tzinfo is None:
+        dt = dt.replace(tzinfo=timezone.utc)
+    
+    # Integer microsecond arithmetic avoids float rounding from .timestamp()
+    return (dt - _EPOCH) // _ONE_MICROSECOND * 1000
+
+
+class _EventWindow:
+    """
+    Column-oriented storage for the events of a single type
+    
+    Epoch-nanosecond timestamps (an int64 array) and events live in parallel
+    columns aligned by index and kept sorted by timestamp, so expiry and
+    time-window queries binary-search the timestamp column instead of touching
+    every event dict.
+    """
+    
+    __slots__ = ('timestamps', 'events')
+    
+    def __init__(self):
+        self.timestamps = array('q')
+        self.events = []
+    
+    def __len__(self) -> int:
+        return len(self.events)
+    
+    def append(self, timestamp: int, event: Dict[str, Any]):
+        """Insert an event, keeping the columns ordered by timestamp"""
+        if not self.timestamps or timestamp >= self.timestamps[-1]:
+            self.timestamps.append(timestamp)
+            self.events.append(event)
+        else:
+            # Late arrival: O(n) insert, but in-order streams never get here
+            index = bisect_right(self.timestamps, timestamp)
+            self.timestamps.insert(index, timestamp)
+            self.events.insert(index, event)
+    
+    def first_index_at_or_after(self, cutoff: int) -> int:
+        """Index of the first event with timestamp >= cutoff"""
+        return bisect_left(self.timestamps, cutoff)
+    
+    def trim(self, count: int):
+        """Drop the oldest `count` events"""
+        del self.timestamps[:count]
+        del self.events[:count]
+
+
+def _insert_by_time(entries: deque, event: Dict[str, Any]):
+    """Insert an event into a deque kept ordered by '_ts_ns'"""
+    ts_ns = event['_ts_ns']
+    if not entries or entries[-1]['_ts_ns'] <= ts_ns:
+        entries.append(event)
+        return
+    
+    # Late arrival: walk back to its position
+    index = len(entries)
+    while index and entries[index - 1]['_ts_ns'] > ts_ns:
+        index -= 1
+    entries.insert(index, event)
+
+
 class StateManager:
     """Manages event state and temporal windows"""
     
@@ -23,7 +110,18 @@ class StateManager:
         self.retention_window = config['collection']['retention_window']
         
         # Event windows organized by type
-        self.event_windows = defaultdict(deque)
+        self.event_windows = defaultdict(_EventWindow)
+        
+        # Inverted index for configured fields:
+        # event type -> field -> value -> events (oldest first)
+        self.indexed_fields = {
+            event_type: tuple(fields)
+            for event_type, fields in config['collection'].get('indexed_fields', {}).items()
+        }
+        self._index = {
+            event_type: {field: {} for field in fields}
+            for event_type, fields in self.indexed_fields.items()
+        }
         
         # Correlation state
         self.correlation_state = {}
@@ -35,6 +133,10 @@ class StateManager:
             'windows_active': 0
         }
         
+        # Oldest timestamp across all windows, so cleanup can skip the
+        # per-window pass entirely while nothing has reached the cutoff
+        self._oldest_ns = _NO_EVENTS_NS
+        
         print("[STATE_MANAGER] State manager initialized")
     
     def add_event(self, event: Dict[str, Any]):
@@ -46,19 +148,35 @@ class StateManager:
         """
         event_type = event.get('type', 'unknown')
         
-        # Add timestamp if not present
+        # Convert timestamp to epoch nanoseconds once; all window comparisons
+        # are then plain integer compares
         if 'timestamp' not in event:
+            # Stamp now directly rather than formatting and re-parsing a string
+            event['_ts_ns'] = time.time_ns()
             event['timestamp'] = datetime.utcnow().isoformat()
-        
-        # Convert timestamp to datetime for easier comparison
-        if isinstance(event['timestamp'], str):
-            try:
-                event['_timestamp_dt'] = datetime.fromisoformat(event['timestamp'].replace('Z', '+00:00'))
-            except:
-                event['_timestamp_dt'] = datetime.utcnow()
+        elif isinstance(event['timestamp'], str):
+            event['_ts_ns'] = _to_epoch_ns(event['timestamp'])
+        else:
+            event['_ts_ns'] = time.time_ns()
         
         # Add to window
-        self.event_windows[event_type].append(event)
+        window = self.event_windows[event_type]
+        window.append(event['_ts_ns'], event)
+        if len(window) == 1:
+            self.stats['windows_active'] += 1
+        if event['_ts_ns'] < self._oldest_ns:
+            self._oldest_ns = event['_ts_ns']
+        
+        # Update inverted index
+        field_index = self._index.get(event_type)
+        if field_index:
+            for field, values in field_index.items():
+                if field in event:
+                    entries = values.get(event[field])
+                    if entries is None:
+                        entries = values[event[field]] = deque()
+                    _insert_by_time(entries, event)
+        
         self.stats['total_events_stored'] += 1
         
         # Cleanup old events
@@ -75,21 +193,16 @@ class StateManager:
         Returns:
             List of events
         """
-        events = list(self.event_windows.get(event_type, []))
+        window = self.event_windows.get(event_type)
+        if window is None:
+            return []
         
         if window_seconds is None:
-            return events
+            return list(window.events)
         
         # Filter by time window
-        cutoff_time = datetime.utcnow() - timedelta(seconds=window_seconds)
-        filtered = []
-        
-        for event in events:
-            event_time = event.get('_timestamp_dt', datetime.utcnow())
-            if event_time >= cutoff_time:
-                filtered.append(event)
-        
-        return filtered
+        cutoff_ns = time.time_ns() - window_seconds * _NS_PER_SECOND
+        return window.events[window.first_index_at_or_after(cutoff_ns):]
     
     def get_events_by_field(self, event_type: str, field: str, value: Any, 
                            window_seconds: Optional[int] = None) -> List[Dict]:
@@ -105,6 +218,19 @@ class StateManager:
         Returns:
             List of matching events
         """
+        values = self._index.get(event_type, {}).get(field)
+        
+        # Indexed lookup costs O(matches); None keeps the scan path because it
+        # also matches events that lack the field entirely
+        if values is not None and value is not None:
+            entries = values.get(value)
+            if not entries:
+                return []
+            if window_seconds is None:
+                return list(entries)
+            cutoff_ns = time.time_ns() - window_seconds * _NS_PER_SECOND
+            return [e for e in entries if e['_ts_ns'] >= cutoff_ns]
+        
         events = self.get_events_by_type(event_type, window_seconds)
         return [e for e in events if e.get(field) == value]
     
@@ -134,28 +260,71 @@ class StateManager:
         Returns:
             Set of unique values
         """
+        values = self._index.get(event_type, {}).get(field)
+        
+        # Indexed: entries are time-ordered, so a value is in the window if
+        # its newest event is. Expiry only runs on insert, so any window is
+        # checked against the cutoff; only "all events" is just the index keys
+        if values is not None:
+            if window_seconds is None:
+                return set(values)
+            cutoff_ns = time.time_ns() - window_seconds * _NS_PER_SECOND
+            return {value for value, entries in values.items() if entries[-1]['_ts_ns'] >= cutoff_ns}
+        
         events = self.get_events_by_type(event_type, window_seconds)
         return {e.get(field) for e in events if field in e}
     
     def _cleanup_expired_events(self):
         """Remove events older than retention window"""
-        cutoff_time = datetime.utcnow() - timedelta(seconds=self.retention_window)
+        cutoff_ns = time.time_ns() - self.retention_window * _NS_PER_SECOND
         
-        for event_type, events in self.event_windows.items():
-            original_count = len(events)
-            
-            # Remove expired events from the left (oldest)
-            while events and events[0].get('_timestamp_dt', datetime.utcnow()) < cutoff_time:
-                events.popleft()
-                self.stats['events_expired'] += 1
+        # Common case: the oldest stored event is still within retention
+        if self._oldest_ns >= cutoff_ns:
+            return
+        
+        oldest_ns = _NO_EVENTS_NS
+        
+        for event_type, window in self.event_windows.items():
+            # Timestamps are sorted, so everything expired is a prefix
+            expired = window.first_index_at_or_after(cutoff_ns)
+            if expired:
+                self._unindex_expired(event_type, window.events[:expired], cutoff_ns)
+                window.trim(expired)
+                self.stats['events_expired'] += expired
+                
+                # Update active windows count
+                if not window:
+                    self.stats['windows_active'] -= 1
             
-            # Update stats
-            if len(events) < original_count:
-                expired = original_count - len(events)
-                # Already counted in events_expired
+            if window and window.timestamps[0] < oldest_ns:
+                oldest_ns = window.timestamps[0]
+        
+        self._oldest_ns = oldest_ns
+    
+    def _unindex_expired(self, event_type: str, expired: List[Dict], cutoff_ns: int):
+        """
+        Drop expired events from the inverted index
+        
+        Args:
+            event_type: Type of the expired events
+            expired: Events being removed from the window
+            cutoff_ns: Retention cutoff in epoch nanoseconds
+        """
+        field_index = self._index.get(event_type)
+        if not field_index:
+            return
         
-        # Update active windows count
-        self.stats['windows_active'] = len([w for w in self.event_windows.values() if len(w) > 0])
+        for field, values in field_index.items():
+            for event in expired:
+                if field not in event:
+                    continue
+                value = event[field]
+                entries = values.get(value)
+                # Index entries are time-ordered, so expired ones are a prefix
+                while entries and entries[0]['_ts_ns'] < cutoff_ns:
+                    entries.popleft()
+                if entries is not None and not entries:
+                    del values[value]
     
     def get_correlation_state(self, correlation_id: str) -> Optional[Dict]:
         """
@@ -139,21 +139,14 @@ app.get('/api/alerts', (req, res) => {
     res.json(state.alerts.slice(-limit));
 });
 
-// Receive new event (from aggregator)
-app.post('/api/events', (req, res) => {
-    const event = req.body;
-
+// Store and broadcast a single event
+function ingestEvent(event) {
     // Add to state
     state.events.push({
         ...event,
         received_at: new Date().toISOString()
     });
 
-    // Keep only last 1000 events
-    if (state.events.length > 1000) {
-        state.events = state.events.slice(-1000);
-    }
-
     state.stats.total_events++;
 
     // Broadcast to connected clients
@@ -161,10 +154,37 @@ app.post('/api/events', (req, res) => {
         type: 'new_event',
         data: event
     });
+}
+
+// Keep only last 1000 events
+function trimEvents() {
+    if (state.events.length > 1000) {
+        state.events = state.events.slice(-1000);
+    }
+}
+
+// Receive new event (from aggregator)
+app.post('/api/events', (req, res) => {
+    ingestEvent(req.body);
+    trimEvents();
 
     res.json({ success: true });
 });
 
+// Receive a batch of events (JSON array) in a single request
+app.post('/api/events/batch', (req, res) => {
+    const events = req.body;
+
+    if (!Array.isArray(events)) {
+        return res.status(400).json({ success: false, error: 'Expected a JSON array of events' });
+    }
+
+    events.forEach(ingestEvent);
+    trimEvents();
+
+    res.json({ success: true, count: events.length });
+});
+
 // Receive new alert (from correlation engine)
 app.post('/api/alerts', (req, res) => {
     const alert = req.body;
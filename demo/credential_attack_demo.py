@@ -3,45 +3,169 @@ LogicCorrelator - Credential Attack Demo
 Demonstrates detection of credential stuffing attack
 """
 
-import json
 import time
 import sys
+import threading
+import http.client
 from datetime import datetime
 from pathlib import Path
+from urllib.parse import urlsplit
+
+try:
+    import requests
+    from requests.adapters import HTTPAdapter
+except ImportError:
+    requests = None
 
 # Add parent directory to path
 sys.path.insert(0, str(Path(__file__).parent.parent))
 
+from core.json_codec import dumps
 from tests.event_generator import EventGenerator
 
 
+class DashboardClient:
+    """Posts demo data to the dashboard API over a persistent connection"""
 
-def run_demo():
-    """Run credential attack demonstration"""
-    import urllib.request
-    import urllib.error
+    def __init__(self, base_url: str = "http://localhost:3000/api",
+                 batch_size: int = 16, flush_interval: float = 0.1):
+        """
+        Initialize dashboard client
+
+        Uses a pooled requests.Session when requests is installed, otherwise
+        a single keep-alive http.client connection. Either way the TCP
+        connection is reused across posts instead of reopened per event.
+
+        Events passed to queue_event() are buffered and sent as one JSON array
+        to /events/batch once batch_size events are waiting or flush_interval
+        seconds after the first buffered event, whichever comes first.
+
+        Args:
+            base_url: Dashboard API base URL
+            batch_size: Maximum events per batch request
+            flush_interval: Maximum seconds an event waits in the buffer
+        """
+        self.base_url = base_url.rstrip('/')
+        self._api = urlsplit(self.base_url)
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+
+        self._event_buffer = []
+        self._flush_timer = None
+        self._buffer_lock = threading.Lock()
+        # Serializes use of the connection between callers and the flush timer
+        self._post_lock = threading.Lock()
+
+        if requests is not None:
+            self._session = requests.Session()
+            self._session.mount('http://', HTTPAdapter(pool_connections=1, pool_maxsize=4))
+            self._conn = None
+        else:
+            self._session = None
+            self._conn = http.client.HTTPConnection(self._api.hostname, self._api.port, timeout=5)
 
-    DASHBOARD_API = "http://localhost:3000/api"
+    def post(self, endpoint: str, payload) -> None:
+        """
+        POST a JSON payload to an API endpoint
+
+        Args:
+            endpoint: Endpoint path relative to the API base (e.g. "events")
+            payload: JSON-serializable payload
+
+        Raises:
+            Exception: If the request fails or the server returns an error status
+        """
+        body = dumps(payload)
+        headers = {'Content-Type': 'application/json'}
+
+        with self._post_lock:
+            self._send(endpoint, body, headers)
+
+    def _send(self, endpoint: str, body: bytes, headers: dict) -> None:
+        """Send one request over the persistent connection"""
+        if self._session is not None:
+            response = self._session.post(f"{self.base_url}/{endpoint}", data=body,
+                                          headers=headers, timeout=5)
+            response.raise_for_status()
+            return
 
-    def send_event(event):
         try:
-            req = urllib.request.Request(
-                f"{DASHBOARD_API}/events",
-                data=json.dumps(event).encode('utf-8'),
-                headers={'Content-Type': 'application/json'}
-            )
-            urllib.request.urlopen(req)
+            self._conn.request('POST', f"{self._api.path}/{endpoint}", body=body, headers=headers)
+            response = self._conn.getresponse()
+            response.read()
+            if response.status >= 400:
+                raise http.client.HTTPException(f"HTTP {response.status} {response.reason}")
+        except Exception:
+            # Drop the broken connection; the next request reconnects
+            self._conn.close()
+            raise
+
+    def queue_event(self, event) -> None:
+        """
+        Buffer an event for the next batch request
+
+        Args:
+            event: Event dictionary
+        """
+        with self._buffer_lock:
+            self._event_buffer.append(event)
+
+            if len(self._event_buffer) < self.batch_size:
+                if self._flush_timer is None:
+                    self._flush_timer = threading.Timer(self.flush_interval, self.flush)
+                    self._flush_timer.daemon = True
+                    self._flush_timer.start()
+                return
+
+            batch = self._take_batch()
+
+        self._send_batch(batch)
+
+    def flush(self) -> None:
+        """Send any buffered events now"""
+        with self._buffer_lock:
+            batch = self._take_batch()
+
+        if batch:
+            self._send_batch(batch)
+
+    def _take_batch(self) -> list:
+        """Detach the buffered events (caller holds the buffer lock)"""
+        if self._flush_timer is not None:
+            self._flush_timer.cancel()
+            self._flush_timer = None
+
+        batch, self._event_buffer = self._event_buffer, []
+        return batch
+
+    def _send_batch(self, batch: list) -> None:
+        """POST a list of events in a single request"""
+        try:
+            self.post('events/batch', batch)
         except Exception as e:
-            print(f"[!] Failed to send event to dashboard: {e}")
+            print(f"[!] Failed to send {len(batch)} event(s) to dashboard: {e}")
+
+    def close(self):
+        """Flush buffered events and close the underlying connection(s)"""
+        self.flush()
+
+        if self._session is not None:
+            self._session.close()
+        else:
+            self._conn.close()
+
+
+def run_demo():
+    """Run credential attack demonstration"""
+    client = DashboardClient()
+    post = client.post
+    send_event = client.queue_event
 
     def send_alert(alert):
         try:
-            req = urllib.request.Request(
-                f"{DASHBOARD_API}/alerts",
-                data=json.dumps(alert).encode('utf-8'),
-                headers={'Content-Type': 'application/json'}
-            )
-            urllib.request.urlopen(req)
+            # Deliver buffered events ahead of the alert they led to
+            client.flush()
+            post('alerts', alert)
         except Exception as e:
             print(f"[!] Failed to send alert to dashboard: {e}")
 
@@ -141,17 +265,14 @@ def run_demo():
 
     def send_correlation(correlation):
         try:
-            req = urllib.request.Request(
-                f"{DASHBOARD_API}/correlations",
-                data=json.dumps(correlation).encode('utf-8'),
-                headers={'Content-Type': 'application/json'}
-            )
-            urllib.request.urlopen(req)
+            client.flush()
+            post('correlations', correlation)
             print("  ✓ Graph data sent to dashboard")
         except Exception as e:
             print(f"[!] Failed to send graph to dashboard: {e}")
 
     send_correlation(correlation_graph)
+    client.close()
     
     print("="*60)
     print("Attack simulation complete!")
@@ -3,7 +3,7 @@ LogicCorrelator - Lateral Movement Demo
 Demonstrates detection of lateral movement via SMB
 """
 
-import json
+import os
 import time
 import sys
 from pathlib import Path
@@ -11,8 +11,17 @@ from pathlib import Path
 # Add parent directory to path
 sys.path.insert(0, str(Path(__file__).parent.parent))
 
+from core.json_codec import dumps
 from tests.event_generator import EventGenerator
 
+# Pacing multiplier for the demo pauses; DEMO_SLEEP=0 runs without stalls
+SLEEP = float(os.environ.get('DEMO_SLEEP', '1'))
+
+
+def _dumps(obj) -> str:
+    """Pretty-print JSON for the console"""
+    return dumps(obj, indent=True).decode('utf-8')
+
 
 def run_demo():
     """Run lateral movement demonstration"""
@@ -41,18 +50,18 @@ def run_demo():
     print("[PHASE 1] Initial SMB connection...")
     event = generator.generate_network_connect('192.168.1.50', 445)
     print(f"  → SMB connection to 192.168.1.50:445")
-    print(f"     {json.dumps(event, indent=2)}")
-    time.sleep(2)
+    print(f"     {_dumps(event)}")
+    time.sleep(2 * SLEEP)
     
     print()
     
     # Phase 2: Remote execution
     print("[PHASE 2] Remote execution tool launched...")
-    time.sleep(1)
+    time.sleep(SLEEP)
     event = generator.generate_process_start('psexec.exe', 'admin')
     print(f"  → PsExec.exe executed")
-    print(f"     {json.dumps(event, indent=2)}")
-    time.sleep(2)
+    print(f"     {_dumps(event)}")
+    time.sleep(2 * SLEEP)
     
     print()
     
@@ -61,10 +70,10 @@ def run_demo():
     targets = ['192.168.1.51', '192.168.1.52', '192.168.1.53']
     
     for target in targets:
-        time.sleep(1)
+        time.sleep(SLEEP)
         event = generator.generate_network_connect(target, 445)
         print(f"  → SMB connection to {target}:445")
-        print(f"     {json.dumps(event, indent=2)}")
+        print(f"     {_dumps(event)}")
     
     print()
     print("="*60)
@@ -3,10 +3,34 @@ LogicCorrelator - DOT Graph Exporter
 Exports correlation decision paths to GraphViz DOT format
 """
 
+import glob
+import hashlib
+import io
+import os
+import re
+import shutil
 import subprocess
-from typing import Dict, List, Any, Optional
+from typing import Dict, List, Any, Optional, TextIO
 from pathlib import Path
 
+try:
+    import pygraphviz
+except ImportError:  # pragma: no cover - optional in-process renderer
+    pygraphviz = None
+
+
+# Characters that would break out of a quoted DOT label
+_DOT_ESCAPE = str.maketrans({'"': '\\"', '\\': '\\\\', '\n': '\\n'})
+
+
+# Digest part of a content-addressed render name: {filename}.{digest}.png
+_RENDER_DIGEST = re.compile(r'[0-9a-f]{32}')
+
+
+def _dot_escape(value: Any) -> str:
+    """Escape a value for use inside a double-quoted DOT label"""
+    return str(value).translate(_DOT_ESCAPE)
+
 
 class DOTExporter:
     """Exports correlation graphs to DOT format"""
@@ -34,12 +58,10 @@ class DOTExporter:
             Path to generated DOT file, or None on error
         """
         try:
-            dot_content = self._generate_dot(correlation)
-            
-            # Save DOT file
+            # Stream the DOT straight to the file
             dot_path = self.output_dir / f"{filename}.dot"
-            with open(dot_path, 'w') as f:
-                f.write(dot_content)
+            with open(dot_path, 'w', encoding='utf-8', newline='\n', buffering=1 << 20) as f:
+                self._write_dot(f, correlation)
             
             print(f"[DOT_EXPORTER] Exported DOT file: {dot_path}")
             
@@ -52,6 +74,33 @@ class DOTExporter:
             print(f"[DOT_EXPORTER] Error exporting graph: {e}")
             return None
     
+    def export_many(self, correlations: Dict[str, Dict[str, Any]]) -> List[str]:
+        """
+        Export several decision graphs and render them with one GraphViz run
+        
+        Args:
+            correlations: Mapping of output filename (without extension) to
+                correlation data
+            
+        Returns:
+            Paths to the generated DOT files
+        """
+        dot_paths = {}
+        for filename, correlation in correlations.items():
+            try:
+                dot_path = self.output_dir / f"{filename}.dot"
+                with open(dot_path, 'w', encoding='utf-8', newline='\n', buffering=1 << 20) as f:
+                    self._write_dot(f, correlation)
+                dot_paths[filename] = dot_path
+            except Exception as e:
+                print(f"[DOT_EXPORTER] Error exporting graph {filename}: {e}")
+        
+        print(f"[DOT_EXPORTER] Exported {len(dot_paths)} DOT files to {self.output_dir}")
+        
+        self._render_many(dot_paths)
+        
+        return [str(path) for path in dot_paths.values()]
+    
     def _generate_dot(self, correlation: Dict[str, Any]) -> str:
         """
         Generate DOT format string from correlation data
@@ -62,83 +111,117 @@ class DOTExporter:
         Returns:
             DOT format string
         """
-        lines = [
-            "digraph CorrelationGraph {",
-            "    rankdir=LR;",
-            "    node [shape=box, style=rounded, fontname=\"Arial\"];",
-            "    edge [fontname=\"Arial\"];",
-            ""
-        ]
+        out = io.StringIO()
+        self._write_dot(out, correlation)
+        return out.getvalue()
+    
+    def _write_dot(self, out: TextIO, correlation: Dict[str, Any]):
+        """
+        Write DOT format lines for correlation data to a text stream
+        
+        Args:
+            out: Writable text stream
+            correlation: Correlation data
+        """
+        write = out.write
+        write(
+            "digraph CorrelationGraph {\n"
+            "    rankdir=LR;\n"
+            "    node [shape=box, style=rounded, fontname=\"Arial\"];\n"
+            "    edge [fontname=\"Arial\"];\n"
+            "\n"
+        )
         
         # Add rule node
-        rule_id = correlation.get('rule_id', 'UNKNOWN')
-        rule_name = correlation.get('rule_name', 'Unknown Rule')
-        lines.append(f'    rule [label="{rule_id}\\n{rule_name}", fillcolor=lightblue, style=filled];')
-        lines.append("")
+        rule_id = _dot_escape(correlation.get('rule_id', 'UNKNOWN'))
+        rule_name = _dot_escape(correlation.get('rule_name', 'Unknown Rule'))
+        write(f'    rule [label="{rule_id}\\n{rule_name}", fillcolor=lightblue, style=filled];\n')
+        write("\n")
         
-        # Add condition nodes
+        # Add condition nodes, then the rule -> cond0 -> cond1 ... chain
         conditions = correlation.get('conditions_evaluated', [])
-        for i, cond in enumerate(conditions):
-            cond_type = cond.get('condition', {}).get('type', 'unknown')
-            matched = cond.get('result', False)
-            event_count = len(cond.get('matched_events', []))
-            
-            color = "lightgreen" if matched else "lightcoral"
-            label = f"Condition {i+1}\\n{cond_type}\\nEvents: {event_count}"
-            
-            lines.append(f'    cond{i} [label="{label}", fillcolor={color}, style=filled];')
-            
-            # Add edge from previous node
-            if i == 0:
-                lines.append(f'    rule -> cond{i};')
-            else:
-                lines.append(f'    cond{i-1} -> cond{i};')
+        names = [f'cond{i}' for i in range(len(conditions))]
+        if conditions:
+            write('\n'.join(
+                f'    {name} [label="Condition {i+1}\\n{_dot_escape(cond.get("condition", {}).get("type", "unknown"))}'
+                f'\\nEvents: {len(cond.get("matched_events", []))}", '
+                f'fillcolor={"lightgreen" if cond.get("result", False) else "lightcoral"}, style=filled];'
+                for i, (name, cond) in enumerate(zip(names, conditions))
+            ))
+            write('\n')
+            write(f'    rule -> {names[0]};\n')
+            write(''.join(f'    {a} -> {b};\n' for a, b in zip(names, names[1:])))
         
-        lines.append("")
+        write("\n")
         
         # Add result node
         matched = correlation.get('matched', False)
         result_color = "green" if matched else "red"
         result_label = "MATCHED\\nAlert Generated" if matched else "NO MATCH"
-        lines.append(f'    result [label="{result_label}", fillcolor={result_color}, style=filled, shape=ellipse];')
+        write(f'    result [label="{result_label}", fillcolor={result_color}, style=filled, shape=ellipse];\n')
         
         if conditions:
-            lines.append(f'    cond{len(conditions)-1} -> result;')
+            write(f'    {names[-1]} -> result;\n')
         
         # Add event nodes (optional, for detailed view)
         if correlation.get('show_events', False):
-            lines.append("")
-            lines.append("    // Event nodes")
-            for i, cond in enumerate(conditions):
-                for j, event in enumerate(cond.get('matched_events', [])[:3]):  # Limit to 3 events
-                    event_label = f"{event.get('type', 'unknown')}\\n{event.get('timestamp', '')}"
-                    lines.append(f'    event{i}_{j} [label="{event_label}", shape=note, fillcolor=lightyellow, style=filled];')
-                    lines.append(f'    cond{i} -> event{i}_{j} [style=dashed];')
+            write("\n")
+            write("    // Event nodes\n")
+            for i, (name, cond) in enumerate(zip(names, conditions)):
+                write(''.join(
+                    f'    event{i}_{j} [label="{_dot_escape(event.get("type", "unknown"))}\\n{_dot_escape(event.get("timestamp", ""))}", '
+                    f'shape=note, fillcolor=lightyellow, style=filled];\n'
+                    f'    {name} -> event{i}_{j} [style=dashed];\n'
+                    for j, event in enumerate(cond.get('matched_events', [])[:3])  # Limit to 3 events
+                ))
         
-        lines.append("}")
-        
-        return '\n'.join(lines)
+        write("}\n")
     
     def _render_graph(self, dot_path: Path, filename: str):
         """
         Render DOT file to PNG using GraphViz
         
+        Renders are cached by DOT content: the image is written to
+        {filename}.{hash}.png and {filename}.png links to it, so re-exporting
+        an identical graph skips GraphViz entirely. GraphViz writes to a
+        temporary name first, so an interrupted render never becomes a cache hit.
+        
         Args:
             dot_path: Path to DOT file
             filename: Base filename
         """
+        partial_path = None
         try:
             png_path = self.output_dir / f"{filename}.png"
+            rendered_path = self._rendered_path(dot_path, filename)
+            
+            if rendered_path.exists():
+                self._link_png(rendered_path, png_path)
+                print(f"[DOT_EXPORTER] Reused cached PNG: {png_path}")
+                return
+            
+            partial_path = rendered_path.with_name(rendered_path.name + ".part")
             
-            # Try to run dot command
+            # Lay out in-process through libgvc when the binding is installed
+            if pygraphviz is not None:
+                graph = pygraphviz.AGraph(string=dot_path.read_text(encoding='utf-8'))
+                graph.draw(str(partial_path), format='png', prog='dot')
+                os.replace(partial_path, rendered_path)
+                self._link_png(rendered_path, png_path)
+                print(f"[DOT_EXPORTER] Rendered PNG: {png_path}")
+                return
+            
+            # Otherwise try to run dot command
             result = subprocess.run(
-                ['dot', '-Tpng', str(dot_path), '-o', str(png_path)],
+                ['dot', '-Tpng', str(dot_path), '-o', str(partial_path)],
                 capture_output=True,
                 text=True,
                 timeout=10
             )
             
             if result.returncode == 0:
+                os.replace(partial_path, rendered_path)
+                self._link_png(rendered_path, png_path)
                 print(f"[DOT_EXPORTER] Rendered PNG: {png_path}")
             else:
                 print(f"[DOT_EXPORTER] GraphViz not available or error rendering")
@@ -149,6 +232,98 @@ class DOTExporter:
             print("[DOT_EXPORTER] GraphViz rendering timed out")
         except Exception as e:
             print(f"[DOT_EXPORTER] Error rendering graph: {e}")
+        finally:
+            # Discard output from a failed or interrupted render
+            if partial_path is not None:
+                partial_path.unlink(missing_ok=True)
+    
+    def _render_many(self, dot_paths: Dict[str, Path]):
+        """
+        Render DOT files to PNG with a single GraphViz process
+        
+        Args:
+            dot_paths: Mapping of base filename to DOT file path
+        """
+        # Split into cached renders and files GraphViz still has to lay out
+        pending = {}
+        for filename, dot_path in dot_paths.items():
+            rendered_path = self._rendered_path(dot_path, filename)
+            if rendered_path.exists():
+                self._link_png(rendered_path, self.output_dir / f"{filename}.png")
+            else:
+                pending[filename] = (dot_path, rendered_path)
+        
+        if not pending:
+            print(f"[DOT_EXPORTER] Reused {len(dot_paths)} cached PNGs")
+            return
+        
+        # Without a process to amortize, in-process rendering goes one by one
+        if pygraphviz is not None:
+            for filename, (dot_path, rendered_path) in pending.items():
+                self._render_graph(dot_path, filename)
+            return
+        
+        # -O writes each input to <input>.png next to it; these are only moved
+        # into the cache after a clean exit
+        outputs = [Path(f"{dot_path}.png") for dot_path, _ in pending.values()]
+        try:
+            result = subprocess.run(
+                ['dot', '-Tpng', '-O', *(str(dot_path) for dot_path, _ in pending.values())],
+                capture_output=True,
+                text=True,
+                timeout=10 * len(pending)
+            )
+            
+            if result.returncode != 0:
+                print(f"[DOT_EXPORTER] GraphViz not available or error rendering")
+                return
+            
+            for output, (filename, (_, rendered_path)) in zip(outputs, pending.items()):
+                os.replace(output, rendered_path)
+                self._link_png(rendered_path, self.output_dir / f"{filename}.png")
+            
+            print(f"[DOT_EXPORTER] Rendered {len(pending)} PNGs, reused {len(dot_paths) - len(pending)} cached")
+                
+        except FileNotFoundError:
+            print("[DOT_EXPORTER] GraphViz 'dot' command not found - install GraphViz to render images")
+        except subprocess.TimeoutExpired:
+            print("[DOT_EXPORTER] GraphViz rendering timed out")
+        except Exception as e:
+            print(f"[DOT_EXPORTER] Error rendering graphs: {e}")
+        finally:
+            # Discard output from a failed or interrupted render
+            for output in outputs:
+                output.unlink(missing_ok=True)
+    
+    def _rendered_path(self, dot_path: Path, filename: str) -> Path:
+        """Content-addressed PNG path for a DOT file"""
+        digest = hashlib.blake2b(dot_path.read_bytes(), digest_size=16).hexdigest()
+        return self.output_dir / f"{filename}.{digest}.png"
+    
+    def _link_png(self, rendered_path: Path, png_path: Path):
+        """
+        Point the stable PNG name at a content-addressed render
+        
+        Args:
+            rendered_path: Hash-named PNG produced by GraphViz
+            png_path: Stable {filename}.png path
+        """
+        tmp_path = png_path.with_name(png_path.name + ".tmp")
+        try:
+            if tmp_path.is_symlink() or tmp_path.exists():
+                tmp_path.unlink()
+            tmp_path.symlink_to(rendered_path.name)
+        except OSError:
+            # Symlinks unavailable (e.g. Windows without privileges)
+            shutil.copyfile(rendered_path, tmp_path)
+        os.replace(tmp_path, png_path)
+        
+        # Earlier renders of this graph are no longer linked; keep only the
+        # current one so the output directory does not grow with every change
+        prefix = png_path.stem + "."
+        for old_path in self.output_dir.glob(glob.escape(prefix) + "*.png"):
+            if old_path != rendered_path and _RENDER_DIGEST.fullmatch(old_path.name[len(prefix):-4]):
+                old_path.unlink(missing_ok=True)
     
     def export_correlation_chain(self, events: List[Dict], rule_name: str, filename: str) -> Optional[str]:
         """
@@ -170,21 +345,18 @@ class DOTExporter:
         ]
         
         # Add rule node
-        lines.append(f'    rule [label="{rule_name}", shape=ellipse, fillcolor=lightblue, style=filled];')
+        lines.append(f'    rule [label="{_dot_escape(rule_name)}", shape=ellipse, fillcolor=lightblue, style=filled];')
         
-        # Add event nodes
-        for i, event in enumerate(events):
-            event_type = event.get('type', 'unknown')
-            timestamp = event.get('timestamp', '')[:19]  # Truncate timestamp
-            user = event.get('user', 'N/A')
-            
-            label = f"{event_type}\\n{timestamp}\\nUser: {user}"
-            lines.append(f'    event{i} [label="{label}", fillcolor=lightyellow, style=filled];')
-            
-            if i == 0:
-                lines.append(f'    rule -> event{i};')
-            else:
-                lines.append(f'    event{i-1} -> event{i};')
+        # Add event nodes (timestamps truncated to seconds), then the chain
+        names = [f'event{i}' for i in range(len(events))]
+        lines.extend(
+            f'    {name} [label="{_dot_escape(event.get("type", "unknown"))}\\n{_dot_escape(event.get("timestamp", "")[:19])}'
+            f'\\nUser: {_dot_escape(event.get("user", "N/A"))}", fillcolor=lightyellow, style=filled];'
+            for name, event in zip(names, events)
+        )
+        if names:
+            lines.append(f'    rule -> {names[0]};')
+            lines.extend(f'    {a} -> {b};' for a, b in zip(names, names[1:]))
         
         lines.append("}")
         
@@ -192,8 +364,7 @@ class DOTExporter:
         
         # Save file
         dot_path = self.output_dir / f"{filename}.dot"
-        with open(dot_path, 'w') as f:
-            f.write(dot_content)
+        dot_path.write_bytes(dot_content.encode('utf-8'))
         
         print(f"[DOT_EXPORTER] Exported correlation chain: {dot_path}")
         
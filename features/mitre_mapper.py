@@ -3,16 +3,60 @@ LogicCorrelator - MITRE ATT&CK Mapper
 Maps detected patterns to MITRE ATT&CK techniques
 """
 
-import json
-from typing import Dict, List, Any, Optional
+from bisect import bisect_right
+from collections import Counter
+from itertools import chain
+from typing import Dict, List, Any, Optional, Tuple
 from pathlib import Path
 
+from core.json_codec import dumps, loads
+
+
+# Technique database, loaded on first use
+TECHNIQUES_PATH = Path(__file__).resolve().parent.parent / "config" / "mitre_techniques.json"
+
+# Per-technique lookups derived from MITREMapper.TECHNIQUES by _build_indices()
+_TACTIC0: Dict[str, str] = {}               # technique -> navigator tactic slug
+_TACTICS_SET: Dict[str, frozenset] = {}     # technique -> all tactics
+_ENRICHMENT: Dict[str, Dict[str, str]] = {} # technique -> mitre_details entry
+
+# Detection score bands: scores at or above _SCORE_THRESHOLDS[i] get _SCORE_COLORS[i + 1]
+_SCORE_THRESHOLDS = (0.2, 0.4, 0.6, 0.8)
+_SCORE_COLORS = (
+    "#66ff66",  # Green - infrequent
+    "#99cc00",  # Light green
+    "#ffcc00",  # Yellow
+    "#ff6600",  # Orange
+    "#ff0000",  # Red - very frequent
+)
+
+
+def _score_and_color(counts: List[int]) -> Tuple[List[float], List[str]]:
+    """
+    Score detection counts against the most frequent one and pick band colors
+    
+    Args:
+        counts: Occurrences per technique
+        
+    Returns:
+        (scores in [0, 1], hex colors) in the order of counts
+    """
+    max_count = max(counts, default=1)
+    scores = [count / max_count for count in counts]
+    return scores, [_SCORE_COLORS[bisect_right(_SCORE_THRESHOLDS, score)] for score in scores]
+
 
 class MITREMapper:
     """Maps correlation rules and alerts to MITRE ATT&CK framework"""
     
-    # MITRE ATT&CK technique database (simplified subset)
-    TECHNIQUES = {
+    # Technique database; filled from TECHNIQUES_PATH by _load()
+    TECHNIQUES: Dict[str, Dict[str, Any]] = {}
+    
+    # Distinct parent techniques in TECHNIQUES (sub-techniques fold into T####)
+    _TOTAL_TECHNIQUES = 0
+    
+    # Built-in subset used when the JSON database is unavailable
+    FALLBACK_TECHNIQUES = {
         "T1110": {
             "name": "Brute Force",
             "description": "Adversaries may use brute force techniques to gain access to accounts",
@@ -100,8 +144,46 @@ class MITREMapper:
         }
     }
     
+    @classmethod
+    def _load(cls):
+        """Load TECHNIQUES from the JSON database, falling back to the built-in subset"""
+        try:
+            with open(TECHNIQUES_PATH, 'rb') as f:
+                data = f.read()
+            cls.TECHNIQUES = loads(data)
+        except (OSError, ValueError) as e:
+            print(f"[MITRE_MAPPER] Could not load {TECHNIQUES_PATH}: {e} - using built-in techniques")
+            cls.TECHNIQUES = dict(cls.FALLBACK_TECHNIQUES)
+        
+        cls._build_indices()
+    
+    @classmethod
+    def _build_indices(cls):
+        """Flatten TECHNIQUES into the module-level lookup tables"""
+        _TACTIC0.clear()
+        _TACTICS_SET.clear()
+        _ENRICHMENT.clear()
+        for tech_id, tech_info in cls.TECHNIQUES.items():
+            tactics = tech_info['tactics']
+            _TACTIC0[tech_id] = tactics[0].lower().replace(' ', '-')
+            _TACTICS_SET[tech_id] = frozenset(tactics)
+            _ENRICHMENT[tech_id] = {
+                'id': tech_id,
+                'name': tech_info['name'],
+                'description': tech_info['description'],
+                'url': tech_info['url']
+            }
+        
+        cls._TOTAL_TECHNIQUES = len({tech_id.split('.')[0] for tech_id in cls.TECHNIQUES})
+    
     def __init__(self):
         """Initialize MITRE mapper"""
+        if not self.TECHNIQUES:
+            type(self)._load()
+        
+        # Running technique counts for incremental layer snapshots
+        self._tech_counts: Counter = Counter()
+        self._alerts_ingested = 0
         print(f"[MITRE_MAPPER] Initialized with {len(self.TECHNIQUES)} techniques")
     
     def get_technique_info(self, technique_id: str) -> Optional[Dict[str, Any]]:
@@ -132,19 +214,14 @@ class MITREMapper:
         if not technique_ids:
             return enriched
         
-        mitre_details = []
-        tactics = set()
+        # Entries are copied so callers can modify an enriched alert without
+        # touching the shared table (a read-only proxy would not serialize)
+        mitre_details = [_ENRICHMENT[tech_id].copy() for tech_id in technique_ids if tech_id in _ENRICHMENT]
         
-        for tech_id in technique_ids:
-            tech_info = self.get_technique_info(tech_id)
-            if tech_info:
-                mitre_details.append({
-                    'id': tech_id,
-                    'name': tech_info['name'],
-                    'description': tech_info['description'],
-                    'url': tech_info['url']
-                })
-                tactics.update(tech_info['tactics'])
+        # Dict as an ordered set: tactics keep first-seen order
+        tactics: Dict[str, None] = {}
+        for detail in mitre_details:
+            tactics.update(dict.fromkeys(self.TECHNIQUES[detail['id']]['tactics']))
         
         enriched['mitre_details'] = mitre_details
         enriched['mitre_tactics'] = list(tactics)
@@ -163,27 +240,61 @@ class MITREMapper:
         Returns:
             ATT&CK Navigator layer JSON
         """
-        # Count technique occurrences
-        technique_counts = {}
-        for alert in alerts:
-            for tech_id in alert.get('mitre_techniques', []):
-                technique_counts[tech_id] = technique_counts.get(tech_id, 0) + 1
+        # Count technique occurrences across all alerts in one pass
+        technique_counts = Counter(chain.from_iterable(alert.get('mitre_techniques') or () for alert in alerts))
+        
+        return self._build_layer(technique_counts, len(alerts), layer_name)
+    
+    def ingest_alert(self, alert: Dict[str, Any]):
+        """
+        Add one alert to the running technique counts used by snapshot_layer
+        
+        Args:
+            alert: Alert with MITRE techniques
+        """
+        self._tech_counts.update(alert.get('mitre_techniques') or ())
+        self._alerts_ingested += 1
+    
+    def snapshot_layer(self, layer_name: str = "LogicCorrelator Detections") -> Dict:
+        """
+        Generate a Navigator layer from all alerts ingested so far
         
-        # Build layer
+        Cost depends on the number of distinct techniques, not on how many
+        alerts have been ingested.
+        
+        Args:
+            layer_name: Name for the layer
+            
+        Returns:
+            ATT&CK Navigator layer JSON
+        """
+        return self._build_layer(self._tech_counts, self._alerts_ingested, layer_name)
+    
+    def _build_layer(self, technique_counts: Counter, alert_count: int, layer_name: str) -> Dict:
+        """
+        Build a Navigator layer from technique counts
+        
+        Args:
+            technique_counts: Occurrences per technique ID
+            alert_count: Number of alerts the counts were taken from
+            layer_name: Name for the layer
+            
+        Returns:
+            ATT&CK Navigator layer JSON
+        """
+        # Build layer; color intensity is based on frequency
         techniques = []
-        max_count = max(technique_counts.values()) if technique_counts else 1
+        counts = list(technique_counts.values())
+        scores, colors = _score_and_color(counts)
         
-        for tech_id, count in technique_counts.items():
-            tech_info = self.get_technique_info(tech_id)
-            if tech_info:
-                # Color intensity based on frequency
-                score = count / max_count
-                
+        for tech_id, count, score, color in zip(technique_counts, counts, scores, colors):
+            tactic = _TACTIC0.get(tech_id)
+            if tactic:
                 techniques.append({
                     "techniqueID": tech_id,
-                    "tactic": tech_info['tactics'][0].lower().replace(' ', '-'),
+                    "tactic": tactic,
                     "score": score,
-                    "color": self._get_color_for_score(score),
+                    "color": color,
                     "comment": f"Detected {count} time(s)",
                     "enabled": True
                 })
@@ -196,7 +307,7 @@ class MITREMapper:
                 "layer": "4.4"
             },
             "domain": "enterprise-attack",
-            "description": f"LogicCorrelator detections - {len(alerts)} alerts analyzed",
+            "description": f"LogicCorrelator detections - {alert_count} alerts analyzed",
             "filters": {
                 "platforms": ["windows", "linux"]
             },
@@ -221,27 +332,6 @@ class MITREMapper:
         
         return layer
     
-    def _get_color_for_score(self, score: float) -> str:
-        """
-        Get color based on detection score
-        
-        Args:
-            score: Score between 0 and 1
-            
-        Returns:
-            Hex color string
-        """
-        if score >= 0.8:
-            return "#ff0000"  # Red - very frequent
-        elif score >= 0.6:
-            return "#ff6600"  # Orange
-        elif score >= 0.4:
-            return "#ffcc00"  # Yellow
-        elif score >= 0.2:
-            return "#99cc00"  # Light green
-        else:
-            return "#66ff66"  # Green - infrequent
-    
     def save_navigator_layer(self, layer: Dict, filename: str = "logiccorrelator_layer.json"):
         """
         Save ATT&CK Navigator layer to file
@@ -251,10 +341,10 @@ class MITREMapper:
             filename: Output filename
         """
         output_path = Path("graphs") / filename
-        output_path.parent.mkdir(exist_ok=True)
+        output_path.parent.mkdir(parents=True, exist_ok=True)
         
-        with open(output_path, 'w') as f:
-            json.dump(layer, f, indent=2)
+        # One encoded buffer, one write
+        output_path.write_bytes(dumps(layer, indent=True))
         
         print(f"[MITRE_MAPPER] Saved ATT&CK Navigator layer: {output_path}")
         print(f"[MITRE_MAPPER] Upload to https://mitre-attack.github.io/attack-navigator/")
@@ -269,20 +359,20 @@ class MITREMapper:
         Returns:
             Coverage report dictionary
         """
-        tactics_covered = set()
-        techniques_covered = set()
+        # Known techniques only; unknown IDs contribute nothing
+        techniques_covered = set(chain.from_iterable(alert.get('mitre_techniques') or () for alert in alerts))
+        techniques_covered &= _TACTICS_SET.keys()
+        
+        tactics_covered = set().union(*(_TACTICS_SET[tech_id] for tech_id in techniques_covered))
         
-        for alert in alerts:
-            for tech_id in alert.get('mitre_techniques', []):
-                tech_info = self.get_technique_info(tech_id)
-                if tech_info:
-                    techniques_covered.add(tech_id)
-                    tactics_covered.update(tech_info['tactics'])
+        # Coverage is measured in parent techniques on both sides, so detecting
+        # several sub-techniques of T1110 counts once against T1110
+        parents_covered = {tech_id.split('.')[0] for tech_id in techniques_covered}
         
         return {
             'tactics_covered': list(tactics_covered),
             'techniques_covered': list(techniques_covered),
             'total_tactics': len(tactics_covered),
             'total_techniques': len(techniques_covered),
-            'coverage_percentage': (len(techniques_covered) / len(self.TECHNIQUES)) * 100
+            'coverage_percentage': (len(parents_covered) / self._TOTAL_TECHNIQUES) * 100 if self._TOTAL_TECHNIQUES else 0.0
         }
@@ -3,7 +3,10 @@ LogicCorrelator - Service Orchestrator
 Manages all system components and services
 """
 
+import os
 import sys
+import selectors
+import socket
 import subprocess
 import time
 import signal
@@ -17,12 +20,23 @@ class ServiceOrchestrator:
     def __init__(self):
         """Initialize orchestrator"""
         self.processes: Dict[str, subprocess.Popen] = {}
+        # Service output goes to logs/<name>.log; a never-read pipe would
+        # block the child once the kernel buffer fills
+        self.log_dir = Path("logs")
+        self.log_files = {}
+        self.log_offsets: Dict[str, int] = {}
         self.running = False
         
         # Register signal handlers
         signal.signal(signal.SIGINT, self._signal_handler)
         signal.signal(signal.SIGTERM, self._signal_handler)
         
+        # Child exits wake the health check instead of polling every service
+        # once a second: a pidfd per child on Linux, else a SIGCHLD self-pipe
+        # (POSIX-only), else the one-second poll
+        self._exit_selector = selectors.DefaultSelector()
+        self._child_wakeup = None
+        
         print("="*60)
         print("LogicCorrelator - Service Orchestrator")
         print("="*60)
@@ -33,18 +47,80 @@ class ServiceOrchestrator:
         self.stop_all()
         sys.exit(0)
     
+    def _on_sigchld(self, signum, frame):
+        """SIGCHLD handler; the wakeup fd set in _install_sigchld_wakeup does the signalling"""
+        pass
+    
+    def _install_sigchld_wakeup(self) -> bool:
+        """
+        Route SIGCHLD to a socketpair watched by the exit selector (once)
+        
+        Returns:
+            True if child exits will wake the selector
+        """
+        if self._child_wakeup is not None:
+            return True
+        if not hasattr(signal, 'SIGCHLD'):
+            return False
+        
+        self._child_wakeup, self._child_wakeup_write = socket.socketpair()
+        self._child_wakeup.setblocking(False)
+        self._child_wakeup_write.setblocking(False)
+        signal.set_wakeup_fd(self._child_wakeup_write.fileno(), warn_on_full_buffer=False)
+        signal.signal(signal.SIGCHLD, self._on_sigchld)
+        self._exit_selector.register(self._child_wakeup, selectors.EVENT_READ, data=None)
+        return True
+    
+    def _watch_process(self, name: str, process: subprocess.Popen):
+        """
+        Arrange for the exit of a service to wake the health check
+        
+        Args:
+            name: Service name
+            process: Service process
+        """
+        try:
+            # Readable once the process exits (Linux 5.3+, Python 3.9+)
+            pidfd = os.pidfd_open(process.pid)
+        except (AttributeError, OSError):
+            self._install_sigchld_wakeup()
+            return
+        self._exit_selector.register(pidfd, selectors.EVENT_READ, data=name)
+    
+    def _wait_for_child_exit(self):
+        """Block until a watched child process exits"""
+        if not self._exit_selector.get_map():
+            # Nothing can wake us (e.g. Windows): fall back to polling
+            time.sleep(1)
+            return
+        
+        for key, _ in self._exit_selector.select():
+            if key.data is None:
+                # Drain pending wakeup bytes so the next select blocks again
+                try:
+                    while self._child_wakeup.recv(4096):
+                        pass
+                except BlockingIOError:
+                    pass
+            else:
+                self._exit_selector.unregister(key.fd)
+                os.close(key.fd)
+    
     def start_all(self):
         """Start all services"""
         print("[ORCHESTRATOR] Starting all services...\n")
         self.running = True
         
-        # Start Python aggregator
+        # Start Python aggregator and wait until it reads stdin
         self._start_aggregator()
-        time.sleep(2)
+        if 'aggregator' in self.processes:
+            self._wait_log('aggregator', b"Listening for events", 10)
         
-        # Start Node.js dashboard
+        # Start Node.js dashboard and wait until both ports accept connections
         self._start_dashboard()
-        time.sleep(2)
+        if 'dashboard' in self.processes:
+            if self._wait_port('dashboard', '127.0.0.1', 3000, 10):
+                self._wait_port('dashboard', '127.0.0.1', 3001, 10)
         
         # Start Lua correlation engine (if available)
         self._start_correlation_engine()
@@ -60,25 +136,105 @@ class ServiceOrchestrator:
         # Keep orchestrator running
         try:
             while self.running:
-                time.sleep(1)
+                self._wait_for_child_exit()
                 self._check_health()
         except KeyboardInterrupt:
             print("\n[ORCHESTRATOR] Interrupted")
             self.stop_all()
     
+    def _wait_port(self, name: str, host: str, port: int, timeout: float) -> bool:
+        """
+        Wait until a service's TCP port accepts connections
+        
+        Args:
+            name: Service expected to listen on the port
+            host: Host to connect to
+            port: Port to probe
+            timeout: Seconds to wait before giving up
+            
+        Returns:
+            True if the port became ready, False on timeout or exit
+        """
+        process = self.processes[name]
+        deadline = time.monotonic() + timeout
+        while True:
+            try:
+                with socket.create_connection((host, port), timeout=0.05):
+                    return True
+            except OSError:
+                if process.poll() is not None:
+                    print(f"[ORCHESTRATOR] ✗ {name} exited with code {process.returncode} "
+                          f"before {host}:{port} was ready (see {self.log_dir / f'{name}.log'})")
+                    return False
+                if time.monotonic() >= deadline:
+                    print(f"[ORCHESTRATOR] ⚠ {host}:{port} not ready after {timeout}s")
+                    return False
+                time.sleep(0.05)
+    
+    def _wait_log(self, name: str, marker: bytes, timeout: float) -> bool:
+        """
+        Wait until a service writes a marker to its log file
+        
+        Args:
+            name: Service name
+            marker: Bytes that signal readiness
+            timeout: Seconds to wait before giving up
+            
+        Returns:
+            True if the marker was seen, False on timeout or exit
+        """
+        process = self.processes[name]
+        deadline = time.monotonic() + timeout
+        
+        with open(self.log_dir / f"{name}.log", 'rb') as log:
+            # Only output from this run counts
+            log.seek(self.log_offsets[name])
+            seen = b""
+            while marker not in seen:
+                chunk = log.read()
+                if chunk:
+                    # Keep only enough to match a marker split across reads
+                    seen = seen[-len(marker):] + chunk
+                    continue
+                if process.poll() is not None:
+                    return False
+                if time.monotonic() >= deadline:
+                    print(f"[ORCHESTRATOR] ⚠ {name} not ready after {timeout}s")
+                    return False
+                time.sleep(0.05)
+        return True
+    
+    def _open_log(self, name: str):
+        """
+        Open the append-only log file for a service
+        
+        Args:
+            name: Service name
+            
+        Returns:
+            Unbuffered binary file handle for the child's stdout/stderr
+        """
+        self.log_dir.mkdir(exist_ok=True)
+        log = open(self.log_dir / f"{name}.log", 'ab', buffering=0)
+        self.log_files[name] = log
+        self.log_offsets[name] = log.tell()
+        return log
+    
     def _start_aggregator(self):
         """Start Python event aggregator"""
         print("[ORCHESTRATOR] Starting event aggregator...")
         
         try:
+            log = self._open_log('aggregator')
             process = subprocess.Popen(
                 [sys.executable, "core/event_aggregator.py"],
-                stdout=subprocess.PIPE,
-                stderr=subprocess.PIPE,
+                stdout=log,
+                stderr=subprocess.STDOUT,
                 stdin=subprocess.PIPE
             )
             
             self.processes['aggregator'] = process
+            self._watch_process('aggregator', process)
             print("[ORCHESTRATOR] ✓ Event aggregator started (PID: {})".format(process.pid))
             
         except Exception as e:
@@ -89,14 +245,16 @@ class ServiceOrchestrator:
         print("[ORCHESTRATOR] Starting dashboard server...")
         
         try:
+            log = self._open_log('dashboard')
             process = subprocess.Popen(
                 ["node", "dashboard_server.js"],
                 cwd="dashboard",
-                stdout=subprocess.PIPE,
-                stderr=subprocess.PIPE
+                stdout=log,
+                stderr=subprocess.STDOUT
             )
             
             self.processes['dashboard'] = process
+            self._watch_process('dashboard', process)
             print("[ORCHESTRATOR] ✓ Dashboard server started (PID: {})".format(process.pid))
             
         except Exception as e:
@@ -145,6 +303,10 @@ class ServiceOrchestrator:
             except Exception as e:
                 print(f"[ORCHESTRATOR] ✗ Error stopping {name}: {e}")
         
+        for log in self.log_files.values():
+            log.close()
+        self.log_files.clear()
+        
         print("[ORCHESTRATOR] All services stopped")
     
     def get_status(self):
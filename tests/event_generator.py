@@ -3,80 +3,163 @@ LogicCorrelator - Event Generator
 Generates synthetic events for testing and demonstration
 """
 
-import json
+import argparse
+import gzip
+import sys
 import time
 import random
 from datetime import datetime, timedelta
+from pathlib import Path
 from typing import List, Dict, Any
 
+# Add parent directory to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from core.json_codec import dumps
+
 
 class EventGenerator:
     """Generates synthetic security events"""
     
+    __slots__ = (
+        '_clock_offset', '_cached_ts', '_cached_ts_time',
+        'users', 'ips', 'external_ips', 'processes', 'dest_ports',
+        '_n_users', '_n_ips', '_n_external_ips', '_n_processes', '_n_dest_ports',
+        '_proc_meta', '_proto_auth_fail', '_proto_auth_success',
+        '_proto_process_start', '_proto_network_connect'
+    )
+    
     def __init__(self):
         """Initialize event generator"""
-        self.users = ['alice', 'bob', 'charlie', 'admin', 'service_account']
-        self.ips = [f'192.168.1.{i}' for i in range(10, 50)]
-        self.external_ips = ['203.0.113.10', '198.51.100.20', '192.0.2.30']
-        self.processes = [
+        # Scenario pauses advance this offset instead of sleeping, so events
+        # keep their relative spacing without blocking the caller. It is reset
+        # around each scenario so spacing never accumulates across calls
+        self._clock_offset = timedelta(0)
+        # Last formatted timestamp, reused for calls within the same millisecond
+        self._cached_ts = ''
+        self._cached_ts_time = 0.0
+        self.users = ('alice', 'bob', 'charlie', 'admin', 'service_account')
+        self.ips = tuple(f'192.168.1.{i}' for i in range(10, 50))
+        self.external_ips = ('203.0.113.10', '198.51.100.20', '192.0.2.30')
+        self.processes = (
             'powershell.exe', 'cmd.exe', 'wmic.exe', 'psexec.exe',
             'net.exe', 'sc.exe', 'reg.exe', 'rundll32.exe'
-        ]
+        )
+        self.dest_ports = (80, 443, 445, 3389)
+        # Pool sizes for direct index draws: pool[int(random() * n)] skips
+        # the random.choice call (same method random.choices uses)
+        self._n_users = len(self.users)
+        self._n_ips = len(self.ips)
+        self._n_external_ips = len(self.external_ips)
+        self._n_processes = len(self.processes)
+        self._n_dest_ports = len(self.dest_ports)
+        # Per-process strings, formatted once
+        self._proc_meta = {proc: self._format_proc_meta(proc) for proc in self.processes}
+        # Event templates with every key in output order; generators copy one
+        # and fill the per-event fields, which keeps the key order unchanged
+        self._proto_auth_fail = {
+            'type': 'auth_fail', 'timestamp': None, 'user': None, 'source_ip': None,
+            'service': 'ssh', 'reason': 'invalid_password', '_source': 'event_generator'
+        }
+        self._proto_auth_success = {
+            'type': 'auth_success', 'timestamp': None, 'user': None, 'source_ip': None,
+            'service': 'ssh', '_source': 'event_generator'
+        }
+        self._proto_process_start = {
+            'type': 'process_start', 'timestamp': None, 'process_name': None,
+            'command_line': None, 'pid': None, 'user': None,
+            'executable_path': None, '_source': 'event_generator'
+        }
+        self._proto_network_connect = {
+            'type': 'network_connect', 'timestamp': None, 'source_ip': None,
+            'source_port': None, 'dest_ip': None, 'dest_port': None,
+            'protocol': 'tcp', 'direction': 'outbound', '_source': 'event_generator'
+        }
     
-    def generate_auth_fail(self, user: str = None, ip: str = None) -> Dict[str, Any]:
-        """Generate authentication failure event"""
+    def _now(self) -> str:
+        """Current event timestamp (wall clock plus the running scenario's pauses)"""
+        now = time.time()
+        if now - self._cached_ts_time > 0.001:
+            self._cached_ts = (datetime.utcnow() + self._clock_offset).isoformat() + 'Z'
+            self._cached_ts_time = now
+        return self._cached_ts
+    
+    @staticmethod
+    def _format_proc_meta(proc: str) -> Dict[str, str]:
+        """Command line and executable path for a process name"""
         return {
-            'type': 'auth_fail',
-            'timestamp': datetime.utcnow().isoformat() + 'Z',
-            'user': user or random.choice(self.users),
-            'source_ip': ip or random.choice(self.ips),
-            'service': 'ssh',
-            'reason': 'invalid_password',
-            '_source': 'event_generator'
+            'command_line': f'{proc} /c whoami',
+            'executable_path': f'C:\\Windows\\System32\\{proc}'
         }
     
+    def _reset_clock(self):
+        """Drop synthetic scenario spacing so timestamps follow the wall clock again"""
+        self._clock_offset = timedelta(0)
+        self._cached_ts_time = 0.0
+    
+    def _pause(self, seconds: float, delay_ms: int = 0):
+        """
+        Space out scenario events
+        
+        Args:
+            seconds: Synthetic gap added to later timestamps
+            delay_ms: Real delay in milliseconds instead (for live demos)
+        """
+        if delay_ms:
+            time.sleep(delay_ms / 1000)
+        else:
+            self._clock_offset += timedelta(seconds=seconds)
+            self._cached_ts_time = 0.0
+    
+    def generate_auth_fail(self, user: str = None, ip: str = None) -> Dict[str, Any]:
+        """Generate authentication failure event"""
+        event = self._proto_auth_fail.copy()
+        event['timestamp'] = self._now()
+        event['user'] = user or self.users[int(random.random() * self._n_users)]
+        event['source_ip'] = ip or self.ips[int(random.random() * self._n_ips)]
+        return event
+    
     def generate_auth_success(self, user: str = None, ip: str = None) -> Dict[str, Any]:
         """Generate successful authentication event"""
-        return {
-            'type': 'auth_success',
-            'timestamp': datetime.utcnow().isoformat() + 'Z',
-            'user': user or random.choice(self.users),
-            'source_ip': ip or random.choice(self.ips),
-            'service': 'ssh',
-            '_source': 'event_generator'
-        }
+        event = self._proto_auth_success.copy()
+        event['timestamp'] = self._now()
+        event['user'] = user or self.users[int(random.random() * self._n_users)]
+        event['source_ip'] = ip or self.ips[int(random.random() * self._n_ips)]
+        return event
     
     def generate_process_start(self, process: str = None, user: str = None) -> Dict[str, Any]:
         """Generate process start event"""
-        proc = process or random.choice(self.processes)
-        return {
-            'type': 'process_start',
-            'timestamp': datetime.utcnow().isoformat() + 'Z',
-            'process_name': proc,
-            'command_line': f'{proc} /c whoami',
-            'pid': random.randint(1000, 9999),
-            'user': user or random.choice(self.users),
-            'executable_path': f'C:\\Windows\\System32\\{proc}',
-            '_source': 'event_generator'
-        }
+        proc = process or self.processes[int(random.random() * self._n_processes)]
+        meta = self._proc_meta.get(proc) or self._format_proc_meta(proc)
+        event = self._proto_process_start.copy()
+        event['timestamp'] = self._now()
+        event['process_name'] = proc
+        event['command_line'] = meta['command_line']
+        event['pid'] = 1000 + random.randrange(9000)
+        event['user'] = user or self.users[int(random.random() * self._n_users)]
+        event['executable_path'] = meta['executable_path']
+        return event
     
     def generate_network_connect(self, dest_ip: str = None, dest_port: int = None) -> Dict[str, Any]:
         """Generate network connection event"""
-        return {
-            'type': 'network_connect',
-            'timestamp': datetime.utcnow().isoformat() + 'Z',
-            'source_ip': random.choice(self.ips),
-            'source_port': random.randint(49152, 65535),
-            'dest_ip': dest_ip or random.choice(self.external_ips),
-            'dest_port': dest_port or random.choice([80, 443, 445, 3389]),
-            'protocol': 'tcp',
-            'direction': 'outbound',
-            '_source': 'event_generator'
-        }
+        event = self._proto_network_connect.copy()
+        event['timestamp'] = self._now()
+        event['source_ip'] = self.ips[int(random.random() * self._n_ips)]
+        # The ephemeral range 49152-65535 is exactly 2**14 ports
+        event['source_port'] = 49152 + random.getrandbits(14)
+        event['dest_ip'] = dest_ip or self.external_ips[int(random.random() * self._n_external_ips)]
+        event['dest_port'] = dest_port or self.dest_ports[int(random.random() * self._n_dest_ports)]
+        return event
     
-    def generate_credential_attack_scenario(self) -> List[Dict[str, Any]]:
-        """Generate credential stuffing attack scenario"""
+    def generate_credential_attack_scenario(self, delay_ms: int = 0) -> List[Dict[str, Any]]:
+        """
+        Generate credential stuffing attack scenario
+        
+        Args:
+            delay_ms: Real delay between events; 0 spaces timestamps without sleeping
+        """
         events = []
+        self._reset_clock()
         user = 'alice'
         ip = '192.168.1.100'
         
@@ -85,74 +168,121 @@ class EventGenerator:
         # Multiple failed logins
         for i in range(5):
             events.append(self.generate_auth_fail(user, ip))
-            time.sleep(0.1)
+            self._pause(0.1, delay_ms)
         
         # Successful login
-        time.sleep(0.5)
+        self._pause(0.5, delay_ms)
         events.append(self.generate_auth_success(user, ip))
         
         # Suspicious process execution
-        time.sleep(0.5)
+        self._pause(0.5, delay_ms)
         events.append(self.generate_process_start('powershell.exe', user))
         
         # External connection
-        time.sleep(0.5)
+        self._pause(0.5, delay_ms)
         events.append(self.generate_network_connect('203.0.113.10', 443))
         
+        self._reset_clock()
         return events
     
-    def generate_lateral_movement_scenario(self) -> List[Dict[str, Any]]:
-        """Generate lateral movement scenario"""
+    def generate_lateral_movement_scenario(self, delay_ms: int = 0) -> List[Dict[str, Any]]:
+        """
+        Generate lateral movement scenario
+        
+        Args:
+            delay_ms: Real delay between events; 0 spaces timestamps without sleeping
+        """
         events = []
+        self._reset_clock()
         user = 'admin'
         
         print("[GENERATOR] Generating lateral movement scenario...")
         
         # SMB connection
         events.append(self.generate_network_connect('192.168.1.50', 445))
-        time.sleep(0.5)
+        self._pause(0.5, delay_ms)
         
         # Remote execution
         events.append(self.generate_process_start('psexec.exe', user))
-        time.sleep(0.5)
+        self._pause(0.5, delay_ms)
         
         # Additional SMB activity
         events.append(self.generate_network_connect('192.168.1.51', 445))
         
+        self._reset_clock()
         return events
     
-    def generate_random_events(self, count: int = 10) -> List[Dict[str, Any]]:
-        """Generate random events"""
+    def generate_random_events(self, count: int = 10, delay_ms: int = 0) -> List[Dict[str, Any]]:
+        """
+        Generate random events
+        
+        Args:
+            count: Number of events
+            delay_ms: Real delay between events; 0 spaces timestamps without sleeping
+        """
         events = []
-        generators = [
-            self.generate_auth_fail,
-            self.generate_auth_success,
-            self.generate_process_start,
-            self.generate_network_connect
-        ]
-        
-        for _ in range(count):
-            generator = random.choice(generators)
-            events.append(generator())
-            time.sleep(0.1)
+        self._reset_clock()
+        
+        # Draw every random field for the batch up front, one call per field
+        kinds = random.choices(range(4), k=count)
+        users = random.choices(self.users, k=count)
+        ips = random.choices(self.ips, k=count)
+        processes = random.choices(self.processes, k=count)
+        dest_ips = random.choices(self.external_ips, k=count)
+        dest_ports = random.choices(self.dest_ports, k=count)
         
+        for i, kind in enumerate(kinds):
+            if kind == 0:
+                events.append(self.generate_auth_fail(users[i], ips[i]))
+            elif kind == 1:
+                events.append(self.generate_auth_success(users[i], ips[i]))
+            elif kind == 2:
+                events.append(self.generate_process_start(processes[i], users[i]))
+            else:
+                events.append(self.generate_network_connect(dest_ips[i], dest_ports[i]))
+            self._pause(0.1, delay_ms)
+        
+        self._reset_clock()
         return events
 
 
+def write_events(events: List[Dict[str, Any]], path: str = None):
+    """
+    Write events as JSON lines in a single write
+    
+    Args:
+        events: Events to write
+        path: Output file (gzip-compressed if it ends in .gz); stdout if None
+    """
+    payload = b''.join([dumps(event) + b'\n' for event in events])
+    
+    if path is None:
+        sys.stdout.flush()
+        sys.stdout.buffer.write(payload)
+        sys.stdout.buffer.flush()
+    elif path.endswith('.gz'):
+        with gzip.open(path, 'wb', compresslevel=1) as f:
+            f.write(payload)
+    else:
+        with open(path, 'wb') as f:
+            f.write(payload)
+
+
 def main():
     """Main entry point"""
-    import sys
+    parser = argparse.ArgumentParser(description="Generate synthetic security events")
+    parser.add_argument('scenario', nargs='?', default='random',
+                        help="credential, lateral or random (default: random)")
+    parser.add_argument('--output', metavar='PATH',
+                        help="write JSON lines to PATH instead of stdout (.gz to compress)")
+    args = parser.parse_args()
     
     print("="*60)
     print("LogicCorrelator - Event Generator")
     print("="*60)
     
     generator = EventGenerator()
-    
-    if len(sys.argv) > 1:
-        scenario = sys.argv[1].lower()
-    else:
-        scenario = 'random'
+    scenario = args.scenario.lower()
     
     # Generate events based on scenario
     if scenario == 'credential':
@@ -167,9 +297,12 @@ def main():
         return 1
     
     # Output events as JSON (one per line)
-    print(f"\nGenerated {len(events)} events:\n")
-    for event in events:
-        print(json.dumps(event))
+    if args.output:
+        write_events(events, args.output)
+        print(f"\nWrote {len(events)} events to {args.output}")
+    else:
+        print(f"\nGenerated {len(events)} events:\n")
+        write_events(events)
     
     return 0
 
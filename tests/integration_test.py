@@ -7,26 +7,75 @@ import json
 import time
 import subprocess
 import sys
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta
 from pathlib import Path
+from typing import Callable, List, Optional
+
+
+_VALIDATOR = None
+
+
+def _get_validator():
+    """Shared EventValidator, loaded once for all tests"""
+    global _VALIDATOR
+    if _VALIDATOR is None:
+        from core.event_schema import EventValidator
+        _VALIDATOR = EventValidator("config/event_schema.json")
+    return _VALIDATOR
+
+
+@dataclass
+class _Result:
+    """Counters and report lines of one test"""
+    name: str
+    log: List[str] = field(default_factory=list)
+    passed: int = 0
+    failed: int = 0
 
 
 class IntegrationTest:
     """Integration tests for LogicCorrelator"""
     
+    __slots__ = ('passed', 'failed', 'tests')
+    
     def __init__(self):
         """Initialize test suite"""
         self.passed = 0
         self.failed = 0
         self.tests = []
     
-    def test_event_validation(self):
+    @staticmethod
+    def _expect(result: _Result, label: str, ok: bool,
+                detail_fn: Optional[Callable[[], str]] = None) -> bool:
+        """
+        Record one check
+        
+        Args:
+            result: Result of the running test
+            label: Line reported when the check passes
+            ok: Check outcome
+            detail_fn: Builds the failure line (defaults to label); only
+                called when the check fails
+            
+        Returns:
+            ok, so callers can stop at the first failure
+        """
+        if ok:
+            result.passed += 1
+            result.log.append(f"  ✓ {label}")
+        else:
+            result.failed += 1
+            result.log.append(f"  ✗ {detail_fn() if detail_fn else label}")
+        return ok
+    
+    def test_event_validation(self) -> _Result:
         """Test event schema validation"""
-        print("\n[TEST] Event Schema Validation...")
+        result = _Result('event_validation')
+        expect = self._expect
         
         try:
-            from core.event_schema import EventValidator
-            
-            validator = EventValidator("config/event_schema.json")
+            validator = _get_validator()
             
             # Valid event
             valid_event = {
@@ -36,13 +85,9 @@ class IntegrationTest:
                 'source_ip': '192.168.1.1'
             }
             
-            if validator.validate(valid_event):
-                print("  ✓ Valid event accepted")
-                self.passed += 1
-            else:
-                print("  ✗ Valid event rejected")
-                self.failed += 1
-                return False
+            if not expect(result, "Valid event accepted", validator.validate(valid_event),
+                          lambda: "Valid event rejected"):
+                return result
             
             # Invalid event (missing required field)
             invalid_event = {
@@ -50,24 +95,18 @@ class IntegrationTest:
                 'user': 'testuser'
             }
             
-            if not validator.validate(invalid_event):
-                print("  ✓ Invalid event rejected")
-                self.passed += 1
-            else:
-                print("  ✗ Invalid event accepted")
-                self.failed += 1
-                return False
-            
-            return True
+            expect(result, "Invalid event rejected", not validator.validate(invalid_event),
+                   lambda: "Invalid event accepted")
             
         except Exception as e:
-            print(f"  ✗ Error: {e}")
-            self.failed += 1
-            return False
+            expect(result, "", False, lambda: f"Error: {e}")
+        
+        return result
     
-    def test_state_manager(self):
+    def test_state_manager(self) -> _Result:
         """Test state manager functionality"""
-        print("\n[TEST] State Manager...")
+        result = _Result('state_manager')
+        expect = self._expect
         
         try:
             from core.state_manager import StateManager
@@ -78,16 +117,17 @@ class IntegrationTest:
             
             manager = StateManager(config)
             
-            # Add events
+            # Add events (recent enough to stay inside the retention window)
+            start = datetime.utcnow() - timedelta(seconds=10)
             event1 = {
                 'type': 'auth_fail',
-                'timestamp': '2025-12-24T12:00:00Z',
+                'timestamp': start.isoformat() + 'Z',
                 'user': 'alice'
             }
             
             event2 = {
                 'type': 'auth_fail',
-                'timestamp': '2025-12-24T12:00:05Z',
+                'timestamp': (start + timedelta(seconds=5)).isoformat() + 'Z',
                 'user': 'alice'
             }
             
@@ -97,34 +137,58 @@ class IntegrationTest:
             # Query events
             events = manager.get_events_by_type('auth_fail')
             
-            if len(events) == 2:
-                print("  ✓ Events stored correctly")
-                self.passed += 1
-            else:
-                print(f"  ✗ Expected 2 events, got {len(events)}")
-                self.failed += 1
-                return False
+            if not expect(result, "Events stored correctly", len(events) == 2,
+                          lambda: f"Expected 2 events, got {len(events)}"):
+                return result
             
             # Count events
             count = manager.count_events('auth_fail')
-            if count == 2:
-                print("  ✓ Event counting works")
-                self.passed += 1
-            else:
-                print(f"  ✗ Expected count 2, got {count}")
-                self.failed += 1
-                return False
+            expect(result, "Event counting works", count == 2,
+                   lambda: f"Expected count 2, got {count}")
+            
+        except Exception as e:
+            expect(result, "", False, lambda: f"Error: {e}")
+        
+        return result
+    
+    def test_state_window_expiry(self) -> _Result:
+        """Test that windowed queries drop events that expired while idle"""
+        result = _Result('state_window_expiry')
+        expect = self._expect
+        
+        try:
+            from core.state_manager import StateManager
+            
+            config = {
+                'collection': {
+                    'retention_window': 60,
+                    'indexed_fields': {'auth_fail': ['user']}
+                }
+            }
+            
+            manager = StateManager(config)
+            
+            # Just inside retention when added, expired after a short idle
+            stamp = datetime.utcnow() - timedelta(seconds=59.8)
+            manager.add_event({
+                'type': 'auth_fail',
+                'timestamp': stamp.isoformat() + 'Z',
+                'user': 'alice'
+            })
+            time.sleep(0.4)
             
-            return True
+            users = manager.get_unique_values('auth_fail', 'user', 60)
+            expect(result, "Idle-expired values excluded from window", not users,
+                   lambda: f"Expected no users, got {sorted(users)}")
             
         except Exception as e:
-            print(f"  ✗ Error: {e}")
-            self.failed += 1
-            return False
+            expect(result, "", False, lambda: f"Error: {e}")
+        
+        return result
     
-    def test_rule_validation(self):
+    def test_rule_validation(self) -> _Result:
         """Test rule validation"""
-        print("\n[TEST] Rule Validation...")
+        result = _Result('rule_validation')
         
         try:
             from tests.rule_validator import RuleValidator
@@ -135,26 +199,21 @@ class IntegrationTest:
             rule_file = "rules/credential_attacks.yaml"
             
             if Path(rule_file).exists():
-                if validator.validate_rule_file(rule_file):
-                    print("  ✓ Rule file validation passed")
-                    self.passed += 1
-                    return True
-                else:
-                    print("  ✗ Rule file validation failed")
-                    self.failed += 1
-                    return False
+                self._expect(result, "Rule file validation passed",
+                             validator.validate_rule_file(rule_file),
+                             lambda: "Rule file validation failed")
             else:
-                print(f"  ⚠ Rule file not found: {rule_file}")
-                return True
+                result.log.append(f"  ⚠ Rule file not found: {rule_file}")
                 
         except Exception as e:
-            print(f"  ✗ Error: {e}")
-            self.failed += 1
-            return False
+            self._expect(result, "", False, lambda: f"Error: {e}")
+        
+        return result
     
-    def test_mitre_mapper(self):
+    def test_mitre_mapper(self) -> _Result:
         """Test MITRE ATT&CK mapper"""
-        print("\n[TEST] MITRE ATT&CK Mapper...")
+        result = _Result('mitre_mapper')
+        expect = self._expect
         
         try:
             from features.mitre_mapper import MITREMapper
@@ -164,13 +223,10 @@ class IntegrationTest:
             # Test technique lookup
             tech_info = mapper.get_technique_info("T1110.001")
             
-            if tech_info and tech_info['name'] == "Password Guessing":
-                print("  ✓ Technique lookup works")
-                self.passed += 1
-            else:
-                print("  ✗ Technique lookup failed")
-                self.failed += 1
-                return False
+            if not expect(result, "Technique lookup works",
+                          bool(tech_info) and tech_info['name'] == "Password Guessing",
+                          lambda: "Technique lookup failed"):
+                return result
             
             # Test alert enrichment
             alert = {
@@ -180,24 +236,19 @@ class IntegrationTest:
             
             enriched = mapper.enrich_alert(alert)
             
-            if 'mitre_details' in enriched and len(enriched['mitre_details']) == 2:
-                print("  ✓ Alert enrichment works")
-                self.passed += 1
-            else:
-                print("  ✗ Alert enrichment failed")
-                self.failed += 1
-                return False
-            
-            return True
+            expect(result, "Alert enrichment works",
+                   'mitre_details' in enriched and len(enriched['mitre_details']) == 2,
+                   lambda: "Alert enrichment failed")
             
         except Exception as e:
-            print(f"  ✗ Error: {e}")
-            self.failed += 1
-            return False
+            expect(result, "", False, lambda: f"Error: {e}")
+        
+        return result
     
-    def test_event_generation(self):
+    def test_event_generation(self) -> _Result:
         """Test event generator"""
-        print("\n[TEST] Event Generator...")
+        result = _Result('event_generation')
+        expect = self._expect
         
         try:
             from tests.event_generator import EventGenerator
@@ -207,34 +258,22 @@ class IntegrationTest:
             # Generate events
             events = generator.generate_random_events(5)
             
-            if len(events) == 5:
-                print("  ✓ Event generation works")
-                self.passed += 1
-            else:
-                print(f"  ✗ Expected 5 events, got {len(events)}")
-                self.failed += 1
-                return False
+            if not expect(result, "Event generation works", len(events) == 5,
+                          lambda: f"Expected 5 events, got {len(events)}"):
+                return result
             
             # Validate generated events
-            from core.event_schema import EventValidator
-            validator = EventValidator("config/event_schema.json")
-            
-            valid_count = sum(1 for e in events if validator.validate(e))
+            validator = _get_validator()
             
-            if valid_count == len(events):
-                print("  ✓ Generated events are valid")
-                self.passed += 1
-            else:
-                print(f"  ✗ Only {valid_count}/{len(events)} events are valid")
-                self.failed += 1
-                return False
+            valid_count = validator.count_valid(events)
             
-            return True
+            expect(result, "Generated events are valid", valid_count == len(events),
+                   lambda: f"Only {valid_count}/{len(events)} events are valid")
             
         except Exception as e:
-            print(f"  ✗ Error: {e}")
-            self.failed += 1
-            return False
+            expect(result, "", False, lambda: f"Error: {e}")
+        
+        return result
     
     def run_all_tests(self):
         """Run all integration tests"""
@@ -242,12 +281,24 @@ class IntegrationTest:
         print("LogicCorrelator - Integration Tests")
         print("="*60)
         
-        # Run tests
-        self.test_event_validation()
-        self.test_state_manager()
-        self.test_rule_validation()
-        self.test_mitre_mapper()
-        self.test_event_generation()
+        tests = [
+            ("Event Schema Validation", self.test_event_validation),
+            ("State Manager", self.test_state_manager),
+            ("State Window Expiry", self.test_state_window_expiry),
+            ("Rule Validation", self.test_rule_validation),
+            ("MITRE ATT&CK Mapper", self.test_mitre_mapper),
+            ("Event Generator", self.test_event_generation)
+        ]
+        
+        # Header first, so output from the code under test lands beneath it
+        for title, test in tests:
+            print(f"\n[TEST] {title}...")
+            result = test()
+            if result.log:
+                print("\n".join(result.log))
+            self.tests.append(result.name)
+            self.passed += result.passed
+            self.failed += result.failed
         
         # Summary
         print("\n" + "="*60)
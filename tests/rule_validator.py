@@ -3,21 +3,52 @@ LogicCorrelator - Rule Validator
 Validates correlation rule syntax and structure
 """
 
+import os
+import re
+import sys
 import yaml
 import json
+from functools import lru_cache
 from pathlib import Path
 from typing import List, Dict, Any
 
+try:
+    from yaml import CSafeLoader as SafeLoader
+except ImportError:  # PyYAML built without libyaml
+    from yaml import SafeLoader
+
+# MITRE ATT&CK technique or sub-technique ID, e.g. T1110 or T1110.001
+_TECH_RE = re.compile(r'^T\d{4}(?:\.\d{3})?$')
+
+
+@lru_cache(maxsize=128)
+def _load_yaml_cached(filepath: str, mtime_ns: int) -> Any:
+    """
+    Parse a YAML file, memoized per path and modification time
+    
+    Args:
+        filepath: Path to YAML file
+        mtime_ns: File modification time, so edits invalidate the cache
+        
+    Returns:
+        Parsed document (shared between callers; treat as read-only)
+    """
+    # Bytes go straight to the parser, skipping the text IO layer
+    with open(filepath, 'rb') as f:
+        return yaml.load(f.read(), Loader=SafeLoader)
+
 
 class RuleValidator:
     """Validates correlation rules"""
     
-    REQUIRED_FIELDS = ['name', 'id', 'severity', 'conditions', 'actions']
-    VALID_SEVERITIES = ['LOW', 'MEDIUM', 'HIGH', 'CRITICAL']
-    VALID_EVENT_TYPES = [
+    __slots__ = ('errors', 'warnings')
+    
+    REQUIRED_FIELDS = frozenset({'name', 'id', 'severity', 'conditions', 'actions'})
+    VALID_SEVERITIES = frozenset({'LOW', 'MEDIUM', 'HIGH', 'CRITICAL'})
+    VALID_EVENT_TYPES = frozenset({
         'auth_fail', 'auth_success', 'process_start', 'network_connect',
         'file_access', 'registry_change', 'privilege_escalation'
-    ]
+    })
     
     def __init__(self):
         """Initialize validator"""
@@ -34,13 +65,29 @@ class RuleValidator:
         Returns:
             True if valid, False otherwise
         """
-        print(f"\n[VALIDATOR] Validating {filepath}...")
+        # Report lines are collected and written in one call per file
+        out = [f"\n[VALIDATOR] Validating {filepath}...\n"]
+        try:
+            return self._validate_file(filepath, out)
+        finally:
+            sys.stdout.write(''.join(out))
+    
+    def _validate_file(self, filepath: str, out: List[str]) -> bool:
+        """
+        Validate a YAML rule file, appending report lines to out
+        
+        Args:
+            filepath: Path to rule file
+            out: Report lines, each ending in a newline
+            
+        Returns:
+            True if valid, False otherwise
+        """
         self.errors = []
         self.warnings = []
         
         try:
-            with open(filepath, 'r') as f:
-                data = yaml.safe_load(f)
+            data = _load_yaml_cached(filepath, os.stat(filepath).st_mtime_ns)
             
             if not data or 'rules' not in data:
                 self.errors.append("File must contain 'rules' key")
@@ -54,53 +101,57 @@ class RuleValidator:
             for i, rule in enumerate(rules):
                 self._validate_rule(rule, i)
             
-            # Print results
+            # Report results
             if self.errors:
-                print(f"  ✗ {len(self.errors)} error(s) found:")
+                out.append(f"  ✗ {len(self.errors)} error(s) found:\n")
                 for error in self.errors:
-                    print(f"    - {error}")
+                    out.append(f"    - {error}\n")
                 return False
             
             if self.warnings:
-                print(f"  ⚠ {len(self.warnings)} warning(s):")
+                out.append(f"  ⚠ {len(self.warnings)} warning(s):\n")
                 for warning in self.warnings:
-                    print(f"    - {warning}")
+                    out.append(f"    - {warning}\n")
             
-            print(f"  ✓ Valid ({len(rules)} rule(s))")
+            out.append(f"  ✓ Valid ({len(rules)} rule(s))\n")
             return True
             
         except yaml.YAMLError as e:
             self.errors.append(f"YAML parsing error: {e}")
-            print(f"  ✗ YAML error: {e}")
+            out.append(f"  ✗ YAML error: {e}\n")
             return False
         except FileNotFoundError:
             self.errors.append(f"File not found: {filepath}")
-            print(f"  ✗ File not found")
+            out.append(f"  ✗ File not found\n")
             return False
         except Exception as e:
             self.errors.append(f"Unexpected error: {e}")
-            print(f"  ✗ Error: {e}")
+            out.append(f"  ✗ Error: {e}\n")
             return False
     
     def _validate_rule(self, rule: Dict[str, Any], index: int):
         """Validate a single rule"""
-        rule_id = rule.get('id', f'rule-{index}')
+        if not isinstance(rule, dict):
+            self.errors.append(f"Rule {index}: not a mapping")
+            return
+        
+        get = rule.get
+        rule_id = get('id', f'rule-{index}')
         
         # Check required fields
-        for field in self.REQUIRED_FIELDS:
-            if field not in rule:
-                self.errors.append(f"Rule {rule_id}: Missing required field '{field}'")
+        for field in sorted(self.REQUIRED_FIELDS - rule.keys()):
+            self.errors.append(f"Rule {rule_id}: Missing required field '{field}'")
         
         # Validate severity
-        severity = rule.get('severity', '').upper()
+        severity = get('severity', '').upper()
         if severity and severity not in self.VALID_SEVERITIES:
             self.errors.append(
                 f"Rule {rule_id}: Invalid severity '{severity}'. "
-                f"Must be one of {self.VALID_SEVERITIES}"
+                f"Must be one of {sorted(self.VALID_SEVERITIES)}"
             )
         
         # Validate conditions
-        conditions = rule.get('conditions', [])
+        conditions = get('conditions', [])
         if not isinstance(conditions, list):
             self.errors.append(f"Rule {rule_id}: 'conditions' must be a list")
         elif len(conditions) == 0:
@@ -110,15 +161,22 @@ class RuleValidator:
                 self._validate_condition(condition, rule_id, i)
         
         # Validate actions
-        actions = rule.get('actions', [])
+        actions = get('actions', [])
         if not isinstance(actions, list):
             self.errors.append(f"Rule {rule_id}: 'actions' must be a list")
         elif len(actions) == 0:
             self.warnings.append(f"Rule {rule_id}: No actions defined")
         
         # Validate MITRE techniques (optional but recommended)
-        if 'mitre_techniques' not in rule:
+        techniques = get('mitre_techniques')
+        if techniques is None and 'mitre_techniques' not in rule:
             self.warnings.append(f"Rule {rule_id}: No MITRE ATT&CK techniques specified")
+        elif not isinstance(techniques, list):
+            self.errors.append(f"Rule {rule_id}: 'mitre_techniques' must be a list")
+        else:
+            for technique in techniques:
+                if not isinstance(technique, str) or not _TECH_RE.match(technique):
+                    self.errors.append(f"Rule {rule_id}: Invalid MITRE technique ID '{technique}'")
     
     def _validate_condition(self, condition: Dict[str, Any], rule_id: str, index: int):
         """Validate a condition"""
@@ -155,15 +213,16 @@ def main():
     print("LogicCorrelator - Rule Validator")
     print("="*60)
     
-    validator = RuleValidator()
     rules_dir = Path("rules")
     
     if not rules_dir.exists():
         print(f"\n[ERROR] Rules directory not found: {rules_dir}")
         return 1
     
-    # Find all YAML files
-    rule_files = list(rules_dir.glob("*.yaml")) + list(rules_dir.glob("*.yml"))
+    # Find all YAML files in one directory scan
+    rule_files = sorted(
+        path for path in rules_dir.iterdir() if path.suffix in ('.yaml', '.yml')
+    )
     
     if not rule_files:
         print(f"\n[WARNING] No rule files found in {rules_dir}")
@@ -172,21 +231,16 @@ def main():
     print(f"\nFound {len(rule_files)} rule file(s)")
     
     # Validate each file
+    validator = RuleValidator()
     all_valid = True
     for rule_file in rule_files:
         if not validator.validate_rule_file(str(rule_file)):
             all_valid = False
     
     # Summary
-    print("\n" + "="*60)
-    if all_valid:
-        print("✓ All rule files are valid!")
-        print("="*60)
-        return 0
-    else:
-        print("✗ Some rule files have errors")
-        print("="*60)
-        return 1
+    status = "✓ All rule files are valid!" if all_valid else "✗ Some rule files have errors"
+    sys.stdout.write(f"\n{'='*60}\n{status}\n{'='*60}\n")
+    return 0 if all_valid else 1
 
 
 if __name__ == "__main__":